@@ -0,0 +1,90 @@
+import logging
+import asyncpg
+from db_connector import (
+    DatabaseConnector,
+    MULTIFAMILYDIVE_COLUMNS,
+    CREDAILY_COLUMNS,
+    MULTIHOUSING_COLUMNS,
+)
+from env_utils import get_db_config_from_env
+
+log = logging.getLogger(__name__)
+
+
+def _upsert_query(table, columns):
+    """Build an asyncpg ($n placeholder) upsert statement keyed on link"""
+    placeholders = ', '.join(f"${i}" for i in range(1, len(columns) + 1))
+    updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns if column != 'link')
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT (link) DO UPDATE SET {updates}"
+    )
+
+
+MULTIFAMILYDIVE_INSERT = _upsert_query('multifamilydive_articles', MULTIFAMILYDIVE_COLUMNS)
+CREDAILY_INSERT = _upsert_query('credaily_articles', CREDAILY_COLUMNS)
+MULTIHOUSING_INSERT = _upsert_query('multihousing_articles', MULTIHOUSING_COLUMNS)
+
+
+async def create_pool(db_config=None):
+    """Create an asyncpg connection pool
+
+    Args:
+        db_config: Dictionary with keys host, database, user, password, port.
+            Defaults to the settings from get_db_config_from_env()
+
+    Returns:
+        asyncpg.Pool
+    """
+    if db_config is None:
+        db_config = get_db_config_from_env()
+    return await asyncpg.create_pool(
+        host=db_config.get('host'),
+        database=db_config.get('database'),
+        user=db_config.get('user'),
+        password=db_config.get('password'),
+        port=db_config.get('port', 5432),
+        min_size=2,
+        max_size=25
+    )
+
+
+async def _insert_articles(pool, insert_query, rows, label):
+    """Pipeline all rows through executemany inside one transaction"""
+    if not rows:
+        return 0
+    try:
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(insert_query, rows)
+        return len(rows)
+    except Exception as e:
+        log.error("Error inserting %s articles: %s", label, e)
+        return 0
+
+
+async def insert_multifamilydive_articles(pool, articles):
+    """Insert multiple MultifamilyDive articles into the database"""
+    success_count = await _insert_articles(
+        pool, MULTIFAMILYDIVE_INSERT, DatabaseConnector.multifamilydive_rows(articles), "MultifamilyDive"
+    )
+    log.info("Successfully inserted %d out of %d MultifamilyDive articles", success_count, len(articles))
+    return success_count
+
+
+async def insert_credaily_articles(pool, articles):
+    """Insert multiple CRE Daily articles into the database"""
+    success_count = await _insert_articles(
+        pool, CREDAILY_INSERT, DatabaseConnector.credaily_rows(articles), "CRE Daily"
+    )
+    log.info("Successfully inserted %d out of %d CRE Daily articles", success_count, len(articles))
+    return success_count
+
+
+async def insert_multihousing_articles(pool, articles):
+    """Insert multiple Multihousing articles into the database"""
+    success_count = await _insert_articles(
+        pool, MULTIHOUSING_INSERT, DatabaseConnector.multihousing_rows(articles), "Multihousing"
+    )
+    log.info("Successfully inserted %d out of %d Multihousing articles", success_count, len(articles))
+    return success_count
@@ -1,6 +1,83 @@
 import psycopg2
-import os
+import io
+import logging
+import threading
 from psycopg2 import sql
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+log = logging.getLogger(__name__)
+
+# Connection pools shared by every DatabaseConnector, keyed by connection settings
+POOL_MIN_CONNECTIONS = 1
+POOL_MAX_CONNECTIONS = 25
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+# Batches with more articles than this are loaded with COPY instead of INSERT
+COPY_THRESHOLD = 200
+
+# Large saves are split into chunks of this many articles, one transaction each,
+# so a failing chunk does not roll back the ones already written
+INSERT_CHUNK_SIZE = 1000
+
+# Column order used by the row builders and the COPY bulk load path
+MULTIFAMILYDIVE_COLUMNS = ('title', 'link', 'summary', 'author', 'author_title', 'date', 'categories', 'content', 'source')
+CREDAILY_COLUMNS = ('title', 'link', 'summary', 'author', 'date', 'categories', 'content')
+MULTIHOUSING_COLUMNS = ('title', 'link', 'summary', 'author', 'date', 'categories', 'image_url', 'content')
+
+# Server-side prepared upserts used by the single-row insert methods
+PREPARED_INSERTS = {
+    'ins_mfd': ('multifamilydive_articles', MULTIFAMILYDIVE_COLUMNS),
+    'ins_cre': ('credaily_articles', CREDAILY_COLUMNS),
+    'ins_mh': ('multihousing_articles', MULTIHOUSING_COLUMNS),
+}
+
+
+def _copy_escape(value):
+    """Escape a value for PostgreSQL's COPY text format"""
+    if value is None:
+        return '\\N'
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+
+def chunked(items, size=INSERT_CHUNK_SIZE):
+    """Yield consecutive slices of items with at most size elements"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _get_pool(host, database, user, password, port):
+    """Return the shared connection pool for these settings, creating it on first use"""
+    key = (host, database, user, password, port)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None or pool.closed:
+            pool = ThreadedConnectionPool(
+                minconn=POOL_MIN_CONNECTIONS,
+                maxconn=POOL_MAX_CONNECTIONS,
+                host=host,
+                database=database,
+                user=user,
+                password=password,
+                port=port
+            )
+            _POOLS[key] = pool
+        return pool
+
+
+def close_all_pools():
+    """Close every pooled connection (call once at process shutdown)"""
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            if not pool.closed:
+                pool.closeall()
+        _POOLS.clear()
+
 
 class DatabaseConnector:
     def __init__(self, host, database, user, password, port=5432):
@@ -10,33 +87,42 @@ class DatabaseConnector:
         self.user = user
         self.password = password
         self.port = port
+        self.pool = None
         self.conn = None
         self.cursor = None
+        self._prepared = set()
     
     def connect(self):
-        """Establish connection to the PostgreSQL database"""
+        """Borrow a connection to the PostgreSQL database from the shared pool"""
         try:
-            self.conn = psycopg2.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                port=self.port
-            )
+            self.pool = _get_pool(self.host, self.database, self.user, self.password, self.port)
+            self.conn = self.pool.getconn()
             self.cursor = self.conn.cursor()
-            print("Successfully connected to PostgreSQL database")
+            self._prepared = set()
+            log.info("Successfully connected to PostgreSQL database")
             return True
         except Exception as e:
-            print(f"Error connecting to PostgreSQL: {str(e)}")
+            log.error("Error connecting to PostgreSQL: %s", e)
             return False
     
     def disconnect(self):
-        """Close connection to the PostgreSQL database"""
+        """Return the connection to the pool"""
         if self.cursor:
             self.cursor.close()
+            self.cursor = None
         if self.conn:
-            self.conn.close()
-            print("Database connection closed")
+            self.pool.putconn(self.conn)
+            self.conn = None
+            log.info("Database connection closed")
+    
+    def __enter__(self):
+        if not self.connect():
+            raise psycopg2.OperationalError("Could not connect to PostgreSQL database")
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disconnect()
+        return False
     
     def create_multifamilydive_table(self):
         """Create table for MultifamilyDive articles if it doesn't exist"""
@@ -58,10 +144,10 @@ class DatabaseConnector:
             """
             self.cursor.execute(create_table_query)
             self.conn.commit()
-            print("MultifamilyDive articles table created or already exists")
+            log.info("MultifamilyDive articles table created or already exists")
             return True
         except Exception as e:
-            print(f"Error creating MultifamilyDive table: {str(e)}")
+            log.error("Error creating MultifamilyDive table: %s", e)
             self.conn.rollback()
             return False
     
@@ -83,105 +169,188 @@ class DatabaseConnector:
             """
             self.cursor.execute(create_table_query)
             self.conn.commit()
-            print("CRE Daily articles table created or already exists")
+            log.info("CRE Daily articles table created or already exists")
             return True
         except Exception as e:
-            print(f"Error creating CRE Daily table: {str(e)}")
+            log.error("Error creating CRE Daily table: %s", e)
             self.conn.rollback()
             return False
     
-    def insert_multifamilydive_article(self, article):
-        """Insert a MultifamilyDive article into the database"""
+    def prepare_statement(self, name, statement):
+        """PREPARE a named statement once per pooled backend connection
+        
+        Prepared statements live as long as the server session, so a connection
+        handed back by the pool may already have this one.
+        
+        Args:
+            name: Statement name
+            statement: psycopg2.sql Composable with the statement to prepare
+        """
+        if name in self._prepared:
+            return
+        self.cursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (name,))
+        if self.cursor.fetchone() is None:
+            self.cursor.execute(sql.SQL("PREPARE {} AS {}").format(sql.Identifier(name), statement))
+        self._prepared.add(name)
+    
+    def _prepare_insert(self, name):
+        """PREPARE one of the PREPARED_INSERTS, touching only its own table"""
+        table, columns = PREPARED_INSERTS[name]
+        self.prepare_statement(name, sql.SQL(
+            "INSERT INTO {} ({}) VALUES ({}) ON CONFLICT (link) DO UPDATE SET {}"
+        ).format(
+            sql.Identifier(table),
+            sql.SQL(', ').join(map(sql.Identifier, columns)),
+            sql.SQL(', ').join(sql.SQL(f"${i}") for i in range(1, len(columns) + 1)),
+            sql.SQL(', ').join(
+                sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column))
+                for column in columns if column != 'link'
+            )
+        ))
+    
+    def _execute_prepared(self, name, row, label):
+        """Run a prepared single-row upsert and commit it"""
         try:
-            # Convert categories list to comma-separated string
-            categories = ','.join(article.get('categories', []))
-            
-            insert_query = """
-            INSERT INTO multifamilydive_articles 
-            (title, link, summary, author, author_title, date, categories, content, source)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (link) DO UPDATE 
-            SET title = EXCLUDED.title,
-                summary = EXCLUDED.summary,
-                author = EXCLUDED.author,
-                author_title = EXCLUDED.author_title,
-                date = EXCLUDED.date,
-                categories = EXCLUDED.categories,
-                content = EXCLUDED.content,
-                source = EXCLUDED.source
-            """
-            
-            self.cursor.execute(insert_query, (
-                article.get('title', ''),
-                article.get('link', ''),
-                article.get('summary', ''),
-                article.get('author', ''),
-                article.get('author_title', ''),
-                article.get('date', ''),
-                categories,
-                article.get('content', ''),
-                article.get('source', 'multifamilydive')
-            ))
+            self._prepare_insert(name)
+            self.cursor.execute(
+                sql.SQL("EXECUTE {} ({})").format(
+                    sql.Identifier(name),
+                    sql.SQL(', ').join(sql.Placeholder() * len(row))
+                ),
+                row
+            )
             self.conn.commit()
             return True
         except Exception as e:
-            print(f"Error inserting MultifamilyDive article: {str(e)}")
+            log.error("Error inserting %s article: %s", label, e)
             self.conn.rollback()
+            # Re-check the session's prepared statements on the next call
+            self._prepared.clear()
             return False
     
+    def insert_multifamilydive_article(self, article):
+        """Insert a MultifamilyDive article into the database"""
+        return self._execute_prepared('ins_mfd', self.multifamilydive_rows([article])[0], "MultifamilyDive")
+    
     def insert_credaily_article(self, article):
         """Insert a CRE Daily article into the database"""
-        try:
+        return self._execute_prepared('ins_cre', self.credaily_rows([article])[0], "CRE Daily")
+    
+    @staticmethod
+    def multifamilydive_rows(articles):
+        """Build row tuples matching MULTIFAMILYDIVE_COLUMNS"""
+        return [(
+            article.get('title', ''),
+            article.get('link', ''),
+            article.get('summary', ''),
+            article.get('author', ''),
+            article.get('author_title', ''),
+            article.get('date', ''),
             # Convert categories list to comma-separated string
-            categories = ','.join(article.get('categories', []))
-            
-            insert_query = """
-            INSERT INTO credaily_articles 
-            (title, link, summary, author, date, categories, content)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (link) DO UPDATE 
-            SET title = EXCLUDED.title,
-                summary = EXCLUDED.summary,
-                author = EXCLUDED.author,
-                date = EXCLUDED.date,
-                categories = EXCLUDED.categories,
-                content = EXCLUDED.content
-            """
+            ','.join(article.get('categories') or ()),
+            article.get('content', ''),
+            article.get('source', 'multifamilydive')
+        ) for article in articles]
+    
+    @staticmethod
+    def credaily_rows(articles):
+        """Build row tuples matching CREDAILY_COLUMNS"""
+        return [(
+            article.get('title', ''),
+            article.get('link', ''),
+            article.get('summary', ''),
+            article.get('author', ''),
+            article.get('date', ''),
+            # Convert categories list to comma-separated string
+            ','.join(article.get('categories') or ()),
+            article.get('content', '')
+        ) for article in articles]
+    
+    @staticmethod
+    def multihousing_rows(articles):
+        """Build row tuples matching MULTIHOUSING_COLUMNS"""
+        return [(
+            article.get('title', ''),
+            article.get('link', ''),
+            article.get('summary', ''),
+            article.get('author', ''),
+            article.get('date', ''),
+            # Convert categories list to comma-separated string
+            ','.join(article.get('categories') or ()),
+            article.get('image_url', ''),
+            article.get('content', '')
+        ) for article in articles]
+    
+    def _upsert_articles(self, insert_query, rows, label, fast_bulk=True):
+        """Upsert a batch of article rows in a single statement and transaction
+        
+        Args:
+            insert_query: INSERT statement with a single VALUES %s placeholder
+            rows: List of row tuples matching the INSERT column list
+            label: Human readable source name used in log messages
+            fast_bulk: Commit without waiting for the WAL flush. A crash may
+                lose the last few seconds of commits but never corrupts data.
             
-            self.cursor.execute(insert_query, (
-                article.get('title', ''),
-                article.get('link', ''),
-                article.get('summary', ''),
-                article.get('author', ''),
-                article.get('date', ''),
-                categories,
-                article.get('content', '')
-            ))
+        Returns:
+            Number of rows written
+        """
+        if not rows:
+            return 0
+        # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement,
+        # so keep only the last occurrence of each link (the per-row behaviour)
+        unique_rows = list({row[1]: row for row in rows}.values())
+        try:
+            if fast_bulk:
+                # Only affects the current transaction
+                self.cursor.execute("SET LOCAL synchronous_commit = OFF")
+            execute_values(self.cursor, insert_query, unique_rows, page_size=500)
             self.conn.commit()
-            return True
+            return len(rows)
         except Exception as e:
-            print(f"Error inserting CRE Daily article: {str(e)}")
+            log.error("Error inserting %s articles: %s", label, e)
             self.conn.rollback()
-            return False
+            return 0
     
-    def insert_multifamilydive_articles(self, articles):
+    def insert_multifamilydive_articles(self, articles, fast_bulk=True):
         """Insert multiple MultifamilyDive articles into the database"""
-        success_count = 0
-        for article in articles:
-            if self.insert_multifamilydive_article(article):
-                success_count += 1
+        insert_query = """
+        INSERT INTO multifamilydive_articles 
+        (title, link, summary, author, author_title, date, categories, content, source)
+        VALUES %s
+        ON CONFLICT (link) DO UPDATE 
+        SET title = EXCLUDED.title,
+            summary = EXCLUDED.summary,
+            author = EXCLUDED.author,
+            author_title = EXCLUDED.author_title,
+            date = EXCLUDED.date,
+            categories = EXCLUDED.categories,
+            content = EXCLUDED.content,
+            source = EXCLUDED.source
+        """
         
-        print(f"Successfully inserted {success_count} out of {len(articles)} MultifamilyDive articles")
+        rows = self.multifamilydive_rows(articles)
+        success_count = self._upsert_articles(insert_query, rows, "MultifamilyDive", fast_bulk)
+        log.info("Successfully inserted %d out of %d MultifamilyDive articles", success_count, len(articles))
         return success_count
     
-    def insert_credaily_articles(self, articles):
+    def insert_credaily_articles(self, articles, fast_bulk=True):
         """Insert multiple CRE Daily articles into the database"""
-        success_count = 0
-        for article in articles:
-            if self.insert_credaily_article(article):
-                success_count += 1
+        insert_query = """
+        INSERT INTO credaily_articles 
+        (title, link, summary, author, date, categories, content)
+        VALUES %s
+        ON CONFLICT (link) DO UPDATE 
+        SET title = EXCLUDED.title,
+            summary = EXCLUDED.summary,
+            author = EXCLUDED.author,
+            date = EXCLUDED.date,
+            categories = EXCLUDED.categories,
+            content = EXCLUDED.content
+        """
         
-        print(f"Successfully inserted {success_count} out of {len(articles)} CRE Daily articles")
+        rows = self.credaily_rows(articles)
+        success_count = self._upsert_articles(insert_query, rows, "CRE Daily", fast_bulk)
+        log.info("Successfully inserted %d out of %d CRE Daily articles", success_count, len(articles))
         return success_count
 
     def create_multihousing_table(self):
@@ -203,56 +372,127 @@ class DatabaseConnector:
             """
             self.cursor.execute(create_table_query)
             self.conn.commit()
-            print("Multihousing articles table created or already exists")
+            log.info("Multihousing articles table created or already exists")
             return True
         except Exception as e:
-            print(f"Error creating Multihousing table: {str(e)}")
+            log.error("Error creating Multihousing table: %s", e)
             self.conn.rollback()
             return False
     
     def insert_multihousing_article(self, article):
         """Insert a Multihousing article into the database"""
-        try:
-            # Convert categories list to comma-separated string
-            categories = ','.join(article.get('categories', []))
-            
-            insert_query = """
-            INSERT INTO multihousing_articles 
-            (title, link, summary, author, date, categories, image_url, content)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (link) DO UPDATE 
-            SET title = EXCLUDED.title,
-                summary = EXCLUDED.summary,
-                author = EXCLUDED.author,
-                date = EXCLUDED.date,
-                categories = EXCLUDED.categories,
-                image_url = EXCLUDED.image_url,
-                content = EXCLUDED.content
-            """
+        return self._execute_prepared('ins_mh', self.multihousing_rows([article])[0], "Multihousing")
+    
+    def insert_multihousing_articles(self, articles, fast_bulk=True):
+        """Insert multiple Multihousing articles into the database"""
+        insert_query = """
+        INSERT INTO multihousing_articles 
+        (title, link, summary, author, date, categories, image_url, content)
+        VALUES %s
+        ON CONFLICT (link) DO UPDATE 
+        SET title = EXCLUDED.title,
+            summary = EXCLUDED.summary,
+            author = EXCLUDED.author,
+            date = EXCLUDED.date,
+            categories = EXCLUDED.categories,
+            image_url = EXCLUDED.image_url,
+            content = EXCLUDED.content
+        """
+        
+        rows = self.multihousing_rows(articles)
+        success_count = self._upsert_articles(insert_query, rows, "Multihousing", fast_bulk)
+        log.info("Successfully inserted %d out of %d Multihousing articles", success_count, len(articles))
+        return success_count
+    
+    def bulk_load_via_copy(self, table, rows, columns):
+        """Upsert rows through a COPY-loaded staging table
+        
+        Much faster than execute_values for large loads because rows are
+        streamed with COPY instead of being parsed as one big INSERT.
+        
+        Args:
+            table: Target table name (must have a unique link column)
+            rows: List of row tuples matching columns
+            columns: Column names, in row order
             
-            self.cursor.execute(insert_query, (
-                article.get('title', ''),
-                article.get('link', ''),
-                article.get('summary', ''),
-                article.get('author', ''),
-                article.get('date', ''),
-                categories,
-                article.get('image_url', ''),
-                article.get('content', '')
-            ))
+        Returns:
+            Number of rows written
+        """
+        if not rows:
+            return 0
+        # Same last-occurrence-wins de-duplication as _upsert_articles
+        link_index = columns.index('link')
+        unique_rows = list({row[link_index]: row for row in rows}.values())
+        
+        buf = io.StringIO()
+        for row in unique_rows:
+            buf.write('\t'.join(_copy_escape(value) for value in row))
+            buf.write('\n')
+        buf.seek(0)
+        
+        staging = sql.Identifier(f"staging_{table}")
+        column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+        update_list = sql.SQL(', ').join(
+            sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column))
+            for column in columns if column != 'link'
+        )
+        try:
+            # Only the data columns are copied, so the staging table does not
+            # borrow the target's id sequence
+            self.cursor.execute(sql.SQL(
+                "CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA"
+            ).format(staging, column_list, sql.Identifier(table)))
+            self.cursor.copy_expert(
+                sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT text)").format(staging, column_list).as_string(self.conn),
+                buf
+            )
+            self.cursor.execute(sql.SQL(
+                "INSERT INTO {0} ({1}) SELECT {1} FROM {2} ON CONFLICT (link) DO UPDATE SET {3}"
+            ).format(sql.Identifier(table), column_list, staging, update_list))
             self.conn.commit()
-            return True
+            return len(rows)
         except Exception as e:
-            print(f"Error inserting Multihousing article: {str(e)}")
+            log.error("Error bulk loading into %s: %s", table, e)
             self.conn.rollback()
-            return False
+            return 0
     
-    def insert_multihousing_articles(self, articles):
-        """Insert multiple Multihousing articles into the database"""
-        success_count = 0
-        for article in articles:
-            if self.insert_multihousing_article(article):
-                success_count += 1
+    def copy_multifamilydive_articles(self, articles):
+        """Bulk load MultifamilyDive articles using COPY"""
+        success_count = self.bulk_load_via_copy(
+            'multifamilydive_articles', self.multifamilydive_rows(articles), MULTIFAMILYDIVE_COLUMNS
+        )
+        log.info("Successfully copied %d out of %d MultifamilyDive articles", success_count, len(articles))
+        return success_count
+    
+    def copy_credaily_articles(self, articles):
+        """Bulk load CRE Daily articles using COPY"""
+        success_count = self.bulk_load_via_copy(
+            'credaily_articles', self.credaily_rows(articles), CREDAILY_COLUMNS
+        )
+        log.info("Successfully copied %d out of %d CRE Daily articles", success_count, len(articles))
+        return success_count
+    
+    def copy_multihousing_articles(self, articles):
+        """Bulk load Multihousing articles using COPY"""
+        success_count = self.bulk_load_via_copy(
+            'multihousing_articles', self.multihousing_rows(articles), MULTIHOUSING_COLUMNS
+        )
+        log.info("Successfully copied %d out of %d Multihousing articles", success_count, len(articles))
+        return success_count
+    
+    def get_article_links(self, table):
+        """Return every link already stored in an article table
         
-        print(f"Successfully inserted {success_count} out of {len(articles)} Multihousing articles")
-        return success_count 
\ No newline at end of file
+        Args:
+            table: Article table name (multifamilydive_articles, credaily_articles, multihousing_articles)
+            
+        Returns:
+            List of link strings (empty if the table is missing or the query fails)
+        """
+        try:
+            self.cursor.execute(sql.SQL("SELECT link FROM {}").format(sql.Identifier(table)))
+            return [row[0] for row in self.cursor.fetchall()]
+        except Exception as e:
+            log.error("Error reading links from %s: %s", table, e)
+            self.conn.rollback()
+            return []
\ No newline at end of file
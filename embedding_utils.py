@@ -0,0 +1,47 @@
+import tiktoken
+
+# Tokenizer used by the embedding model, loaded once per process
+EMBEDDING_MAX_TOKENS = 8191
+_ENCODING = tiktoken.get_encoding("cl100k_base")
+
+
+def truncate_to_token_limit(text, max_tokens=EMBEDDING_MAX_TOKENS):
+    """Trim text to the embedding model's token limit"""
+    tokens = _ENCODING.encode(text)
+    if len(tokens) > max_tokens:
+        return _ENCODING.decode(tokens[:max_tokens])
+    return text
+
+
+# Total input tokens the embeddings endpoint accepts in one request
+EMBEDDING_REQUEST_MAX_TOKENS = 300000
+
+
+def batch_by_tokens(texts, max_tokens=EMBEDDING_MAX_TOKENS, request_max_tokens=EMBEDDING_REQUEST_MAX_TOKENS):
+    """Trim texts to the token limit and group them into requests under the per-request cap
+    
+    Args:
+        texts: List of texts to embed
+        max_tokens: Token limit for a single text
+        request_max_tokens: Token limit for all texts of one request together
+        
+    Returns:
+        List of lists of trimmed texts, in input order
+    """
+    batches = []
+    batch = []
+    batch_tokens = 0
+    for text in texts:
+        tokens = _ENCODING.encode(text)
+        if len(tokens) > max_tokens:
+            tokens = tokens[:max_tokens]
+            text = _ENCODING.decode(tokens)
+        if batch and batch_tokens + len(tokens) > request_max_tokens:
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(text)
+        batch_tokens += len(tokens)
+    if batch:
+        batches.append(batch)
+    return batches
@@ -1,11 +1,23 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from pathlib import Path
 
+# Places searched for a .env file when no path is given, in order
+_ENV_CANDIDATES = (
+    Path('.env'),                          # current directory
+    Path('../.env'),                       # parent directory (project root)
+    Path(__file__).parent / '.env',        # the spider's directory
+)
+
+@lru_cache(maxsize=None)
 def load_env_file(env_path=None):
     """
     Load environment variables from .env file
     
+    The result is cached per env_path, so repeated calls (e.g. from every
+    spider and module import) only touch the filesystem once.
+    
     Args:
         env_path: Path to .env file. If None, looks for .env in current and parent directories
     
@@ -14,15 +26,7 @@ def load_env_file(env_path=None):
     """
     # If no path provided, look for .env file in current directory and parent directories
     if env_path is None:
-        # Try in the current directory
-        if os.path.exists('.env'):
-            env_path = '.env'
-        # Try in the parent directory (project root)
-        elif os.path.exists('../.env'):
-            env_path = '../.env'
-        # Try in the spider's directory
-        elif os.path.exists(os.path.join(os.path.dirname(__file__), '.env')):
-            env_path = os.path.join(os.path.dirname(__file__), '.env')
+        env_path = next((path for path in _ENV_CANDIDATES if path.exists()), None)
     
     if env_path and os.path.exists(env_path):
         load_dotenv(env_path)
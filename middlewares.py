@@ -101,3 +101,36 @@ class AshbyDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class RetryAfterMiddleware:
+    """Slow a download slot down as far as a 429 response's Retry-After asks
+
+    Runs before RetryMiddleware (which retries the 429 itself) and only
+    raises the slot delay; AutoThrottle never lowers it on non-200 responses.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_response(self, request, response, spider):
+        if response.status != 429:
+            return response
+
+        retry_after = response.headers.get(b"Retry-After")
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            # Missing, or an HTTP date; leave the backoff to AutoThrottle
+            return response
+
+        slot_key = request.meta.get("download_slot")
+        slot = self.crawler.engine.downloader.slots.get(slot_key)
+        if slot is not None and delay > slot.delay:
+            spider.logger.info(f"Got 429 for {request.url}; delaying slot {slot_key} by {delay}s")
+            slot.delay = delay
+        return response
@@ -6,8 +6,121 @@
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+import csv
+import orjson
+from db_connector import DatabaseConnector, close_all_pools
+
+# Write buffer for the streamed CSV/JSON output files
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Items buffered in memory before each PostgreSQL write
+DB_BATCH_SIZE = 500
 
 
 class MyspiderPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class FilePipeline:
+    """Stream items to <spider.output_prefix>_articles.csv and .json as they arrive
+
+    Only the open file buffers are held in memory, not the whole crawl. The
+    files are created with the first item, so a crawl that scrapes nothing
+    leaves the previous export in place.
+    """
+
+    def open_spider(self, spider):
+        self.item_count = 0
+        self.csv_file = None
+        self.csv_writer = None
+        self.json_file = None
+
+    def _open_files(self, spider, fieldnames):
+        prefix = spider.output_prefix
+        self.csv_file = open(f"{prefix}_articles.csv", 'w', newline='', encoding='utf-8',
+                             buffering=OUTPUT_BUFFER_SIZE)
+        # Every item from one spider carries the same keys as the first one
+        self.csv_writer = csv.DictWriter(self.csv_file, fieldnames=fieldnames, extrasaction='ignore')
+        self.csv_writer.writeheader()
+        self.json_file = open(f"{prefix}_articles.json", 'wb', buffering=OUTPUT_BUFFER_SIZE)
+        self.json_file.write(b'[')
+
+    def process_item(self, item, spider):
+        row = ItemAdapter(item).asdict()
+        if self.csv_writer is None:
+            self._open_files(spider, list(row))
+        self.csv_writer.writerow(row)
+
+        if self.item_count:
+            self.json_file.write(b',')
+        self.json_file.write(orjson.dumps(row))
+        self.item_count += 1
+        return item
+
+    def close_spider(self, spider):
+        if self.json_file is None:
+            spider.logger.info("No articles scraped, output files left unchanged")
+            return
+        self.json_file.write(b']')
+        self.json_file.close()
+        self.csv_file.close()
+        spider.logger.info(f"Saved {self.item_count} articles to {spider.output_prefix}_articles.csv/.json")
+
+
+class PostgresBatchPipeline:
+    """Save items to PostgreSQL in batches of DB_BATCH_SIZE over one connection
+
+    Does nothing unless the spider has save_to_db set and a complete
+    database configuration.
+    """
+
+    # Pipelines (one per running spider) still holding a pooled connection;
+    # the pools are closed when the last of them shuts down
+    _open_count = 0
+
+    def open_spider(self, spider):
+        self.items = []
+        self.db = None
+        if not spider.save_to_db:
+            return
+        self.db_config = spider.db_config()
+        if self.db_config is None:
+            spider.logger.error("Database saving enabled but missing database configuration")
+            return
+
+        db = DatabaseConnector(
+            host=self.db_config.get('host'),
+            database=self.db_config.get('database'),
+            user=self.db_config.get('user'),
+            password=self.db_config.get('password'),
+            port=self.db_config.get('port', 5432)
+        )
+        if db.connect():
+            self.db = db
+            PostgresBatchPipeline._open_count += 1
+        else:
+            spider.logger.error("Failed to connect to database. Articles will not be saved.")
+
+    def process_item(self, item, spider):
+        if self.db is not None:
+            self.items.append(ItemAdapter(item).asdict())
+            if len(self.items) >= DB_BATCH_SIZE:
+                self._flush(spider)
+        return item
+
+    def close_spider(self, spider):
+        if self.db is not None:
+            try:
+                self._flush(spider)
+            finally:
+                self.db.disconnect()
+                PostgresBatchPipeline._open_count -= 1
+                if PostgresBatchPipeline._open_count == 0:
+                    close_all_pools()
+
+    def _flush(self, spider):
+        if self.items:
+            spider.logger.info(f"Saving {len(self.items)} articles to PostgreSQL database")
+            spider.scraper.save_to_postgres(self.items, self.db_config, db=self.db)
+            self.items = []
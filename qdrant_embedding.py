@@ -1,12 +1,19 @@
 import os
-import numpy as np
-import pandas as pd
-from db_connector import DatabaseConnector
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from db_connector import DatabaseConnector, close_all_pools
 from env_utils import load_env_file, get_db_config_from_env
+from embedding_utils import truncate_to_token_limit
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from openai import OpenAI
 
+log = logging.getLogger(__name__)
+
 # Load environment variables
 load_env_file()
 
@@ -17,6 +24,39 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 EMBEDDING_MODEL = "text-embedding-3-small"  # Changed from text-embedding-3-large to match collection dimension
 EMBEDDING_DIMENSION = 1536  # text-embedding-3-small uses 1536 dimensions
 
+# Maximum number of texts sent in a single embeddings request
+EMBEDDING_BATCH_SIZE = 256
+
+# Concurrent embeddings requests and the OpenAI request rate limit they share
+EMBEDDING_MAX_WORKERS = 16
+OPENAI_REQUESTS_PER_MINUTE = 3000
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing a fixed number of calls per minute"""
+    
+    def __init__(self, requests_per_minute):
+        self.rate = requests_per_minute / 60.0
+        # Allow at most one second worth of requests in a burst
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
 class QdrantEmbedding:
     def __init__(self, db_connector=None):
         """Initialize with a database connector and Qdrant client"""
@@ -34,11 +74,19 @@ class QdrantEmbedding:
                 port=db_config.get('port', 5432)
             )
             self.db.connect()
+        # One keep-alive HTTP/2 client shared by every embeddings request, so
+        # concurrent requests are multiplexed over a single TLS connection
+        self.http_client = httpx.Client(
+            http2=True,
+            timeout=600.0,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64)
+        )
         self.client = OpenAI(
             api_key=OPENAI_API_KEY,
-            timeout=600.0,
+            http_client=self.http_client,
             max_retries=3,
         )
+        self.rate_limiter = RateLimiter(OPENAI_REQUESTS_PER_MINUTE)
         # Qdrant client for vector storage
         self.qdrant_url = os.getenv("QDRANT_URL")
         self.qdrant_port = int(os.getenv("QDRANT_PORT"))
@@ -52,42 +100,63 @@ class QdrantEmbedding:
             "multihousing": "multihousing_articles"
         }
         
-        # Initialize collections
-        for collection_name in self.collections.values():
-            self.create_collection(collection_name)
+        # Initialize collections, listing the existing ones only once
+        try:
+            existing_collections = {c.name for c in self.qdrant.get_collections().collections}
+        except Exception as e:
+            log.error("Error listing Qdrant collections: %s", e)
+            existing_collections = None
+        if existing_collections is not None:
+            for collection_name in self.collections.values():
+                self.create_collection(collection_name, existing_collections)
 
-    def create_collection(self, collection_name):
-        """Create a Qdrant collection if it doesn't exist"""
+    def create_collection(self, collection_name, existing_collections=None):
+        """Create a Qdrant collection if it doesn't exist
+        
+        Args:
+            collection_name: Name of the Qdrant collection
+            existing_collections: Optional set of already existing collection
+                names, to avoid listing the collections again
+        """
         try:
             # Check if collection exists
-            collections = self.qdrant.get_collections().collections
-            collection_names = [c.name for c in collections]
+            if existing_collections is None:
+                existing_collections = {c.name for c in self.qdrant.get_collections().collections}
             
-            if collection_name not in collection_names:
+            if collection_name not in existing_collections:
                 # Create new collection with the OpenAI embedding dimension 
                 self.qdrant.create_collection(
                     collection_name=collection_name,
                     vectors_config=models.VectorParams(
                         size=EMBEDDING_DIMENSION,
-                        distance=models.Distance.COSINE
+                        distance=models.Distance.COSINE,
+                        # Keep the full float32 vectors on disk, only the int8 copy in RAM
+                        on_disk=True
+                    ),
+                    quantization_config=models.ScalarQuantization(
+                        scalar=models.ScalarQuantizationConfig(
+                            type=models.ScalarType.INT8,
+                            quantile=0.99,
+                            always_ram=True
+                        )
                     )
                 )
-                print(f"Created Qdrant collection: {collection_name}")
+                log.info("Created Qdrant collection: %s", collection_name)
             else:
-                print(f"Qdrant collection already exists: {collection_name}")
+                log.info("Qdrant collection already exists: %s", collection_name)
             
             return True
         except Exception as e:
-            print(f"Error creating Qdrant collection {collection_name}: {str(e)}")
+            log.error("Error creating Qdrant collection %s: %s", collection_name, e)
             return False
 
-    def get_articles(self, source='multifamilydive', limit=100, offset=0):
+    def get_articles(self, source='multifamilydive', limit=100, last_id=0):
         """Retrieve articles from specified source
         
         Args:
             source: Source table name (multifamilydive, credaily, multihousing)
             limit: Maximum number of articles to retrieve
-            offset: Number of articles to skip
+            last_id: Only articles with an id greater than this are returned
             
         Returns:
             List of dictionaries containing article data
@@ -97,11 +166,12 @@ class QdrantEmbedding:
             query = f"""
             SELECT id, title, summary, content, link, author, date, categories
             FROM {table_name}
+            WHERE id > %s
             ORDER BY id
-            LIMIT %s OFFSET %s
+            LIMIT %s
             """
             
-            self.db.cursor.execute(query, (limit, offset))
+            self.db.cursor.execute(query, (last_id, limit))
             results = self.db.cursor.fetchall()
             
             articles = []
@@ -118,10 +188,10 @@ class QdrantEmbedding:
                     'source': source
                 })
             
-            print(f"Retrieved {len(articles)} articles from {table_name}")
+            log.debug("Retrieved %d articles from %s", len(articles), table_name)
             return articles
         except Exception as e:
-            print(f"Error retrieving articles from {table_name}: {str(e)}")
+            log.error("Error retrieving articles from %s: %s", table_name, e)
             return []
 
     def create_embedding(self, text):
@@ -135,10 +205,9 @@ class QdrantEmbedding:
         """
         try:
             # Truncate text if too long (OpenAI has token limits)
-            max_tokens = 8000
-            if len(text) > max_tokens * 4:  # Rough estimate: 4 chars per token
-                text = text[:max_tokens * 4]
+            text = truncate_to_token_limit(text)
             
+            self.rate_limiter.acquire()
             response = self.client.embeddings.create(
                 model=EMBEDDING_MODEL,  # Use consistent model defined at the top
                 input=text
@@ -149,9 +218,49 @@ class QdrantEmbedding:
             return embedding
 
         except Exception as e:
-            print(f"Error creating embedding: {str(e)}")
+            log.error("Error creating embedding: %s", e)
+            return None
+
+    def create_embeddings_batch(self, texts):
+        """Create embeddings for several texts with a single OpenAI request
+        
+        Args:
+            texts: List of texts to create embeddings for
+            
+        Returns:
+            List of embeddings in the same order as texts, or None on failure
+        """
+        try:
+            # Truncate texts if too long (OpenAI has token limits)
+            texts = [truncate_to_token_limit(text) for text in texts]
+            
+            self.rate_limiter.acquire()
+            response = self.client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=texts
+            )
+            
+            # Results carry their input index; sort to be safe
+            return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+        
+        except Exception as e:
+            log.error("Error creating embeddings batch: %s", e)
             return None
 
+    @staticmethod
+    def _article_payload(article):
+        """Build the Qdrant payload stored alongside an article's vector"""
+        return {
+            "article_id": article['id'],
+            "title": article['title'],
+            "summary": article['summary'],
+            "link": article['link'],
+            "author": article['author'],
+            "date": article['date'],
+            "categories": article['categories'],
+            "source": article['source']
+        }
+
     def save_embedding_to_qdrant(self, article, embedding, collection_name):
         """Save embedding to Qdrant
         
@@ -165,16 +274,7 @@ class QdrantEmbedding:
         """
         try:
             # Prepare metadata (payload)
-            payload = {
-                "article_id": article['id'],
-                "title": article['title'],
-                "summary": article['summary'],
-                "link": article['link'],
-                "author": article['author'],
-                "date": article['date'],
-                "categories": article['categories'],
-                "source": article['source']
-            }
+            payload = self._article_payload(article)
             
             # Upsert the point
             self.qdrant.upsert(
@@ -189,12 +289,83 @@ class QdrantEmbedding:
             )
             return True
         except Exception as e:
-            print(f"Error saving embedding to Qdrant: {str(e)}")
+            log.error("Error saving embedding to Qdrant: %s", e)
             return False
 
+    def save_embeddings_batch(self, articles, embeddings, collection_name):
+        """Save several embeddings to Qdrant with a single upsert
+        
+        Args:
+            articles: List of article dictionaries
+            embeddings: List of embeddings, one per article
+            collection_name: Name of the Qdrant collection
+            
+        Returns:
+            Boolean indicating success
+        """
+        try:
+            # Columnar batch: one list per field instead of a PointStruct per article
+            points = models.Batch(
+                ids=[article['id'] for article in articles],
+                vectors=list(embeddings),
+                payloads=[self._article_payload(article) for article in articles]
+            )
+            
+            # Don't wait for indexing so Qdrant can pipeline consecutive batches
+            self.qdrant.upsert(
+                collection_name=collection_name,
+                points=points,
+                wait=False
+            )
+            return True
+        except Exception as e:
+            log.error("Error saving embeddings batch to Qdrant: %s", e)
+            return False
+
+    def _save_embedded_page(self, articles, futures, source, collection_name):
+        """Wait for one page's embedding requests and save the results to Qdrant
+        
+        Args:
+            articles: List of article dictionaries fetched together
+            futures: One future per EMBEDDING_BATCH_SIZE chunk of articles, in order
+            source: Source of the articles
+            collection_name: Name of the Qdrant collection
+            
+        Returns:
+            Number of articles saved
+        """
+        embedded_articles = []
+        embeddings = []
+        for start, future in zip(range(0, len(articles), EMBEDDING_BATCH_SIZE), futures):
+            chunk = articles[start:start + EMBEDDING_BATCH_SIZE]
+            chunk_embeddings = future.result()
+            
+            if not chunk_embeddings:
+                log.warning("Failed to create embeddings for %d articles from %s", len(chunk), source)
+                for article in chunk:
+                    log.debug("Failed to create embedding for article %s from %s", article['id'], article['source'])
+                continue
+            
+            embedded_articles.extend(chunk)
+            embeddings.extend(chunk_embeddings)
+        
+        if not embedded_articles:
+            return 0
+        
+        # Save all embeddings of this page to Qdrant in one request
+        if self.save_embeddings_batch(embedded_articles, embeddings, collection_name):
+            log.info("Processed %d articles from %s", len(embedded_articles), source)
+            return len(embedded_articles)
+        log.warning("Failed to save %d embeddings from %s", len(embedded_articles), source)
+        return 0
+
     def process_articles(self, source='multifamilydive', limit=100, batch_size=10):
         """Process articles from specified source, create embeddings and save them to Qdrant
         
+        Embedding requests run on one thread pool for the whole run. Up to
+        EMBEDDING_MAX_WORKERS pages are in flight at once, so the requests of
+        consecutive pages overlap even when each page fits in a single request.
+        
         Args:
             source: Source table name (multifamilydive, credaily, multihousing)
             limit: Maximum number of articles to process
@@ -204,44 +375,51 @@ class QdrantEmbedding:
             Number of successfully processed articles
         """
         if source not in self.collections:
-            print(f"Unknown source: {source}")
+            log.error("Unknown source: %s", source)
             return 0
             
         collection_name = self.collections[source]
-        offset = 0
+        last_id = 0
+        fetched_count = 0
         processed_count = 0
+        # Pages whose embedding requests were submitted but not saved yet, oldest first
+        in_flight = deque()
         
-        while processed_count < limit:
-            # Get batch of articles
-            batch_limit = min(batch_size, limit - processed_count)
-            articles = self.get_articles(source, batch_limit, offset)
-            
-            if not articles:
-                break
+        with ThreadPoolExecutor(max_workers=EMBEDDING_MAX_WORKERS) as executor:
+            while fetched_count < limit:
+                # Get batch of articles
+                batch_limit = min(batch_size, limit - fetched_count)
+                articles = self.get_articles(source, batch_limit, last_id)
                 
-            for article in articles:
-                # Combine title, summary, and content for embedding
-                text = f"{article['title']} {article['summary']}"
+                if not articles:
+                    break
+                fetched_count += len(articles)
+                last_id = articles[-1]['id']
+                    
+                # Combine title, summary and content for embedding. Slicing content first
+                # avoids copying huge articles; the outer cap is ~8k tokens at 4 chars each.
+                texts = [
+                    " ".join((article['title'], article['summary'], article['content'][:28000]))[:32000]
+                    for article in articles
+                ]
                 
-                # Create embedding
-                embedding = self.create_embedding(text)
+                futures = [
+                    executor.submit(self.create_embeddings_batch, texts[start:start + EMBEDDING_BATCH_SIZE])
+                    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+                ]
+                in_flight.append((articles, futures))
                 
-                if embedding:
-                    # Save embedding to Qdrant
-                    if self.save_embedding_to_qdrant(article, embedding, collection_name):
-                        processed_count += 1
-                        print(f"Processed article {article['id']} from {article['source']}")
-                    else:
-                        print(f"Failed to save embedding for article {article['id']} from {article['source']}")
-                else:
-                    print(f"Failed to create embedding for article {article['id']} from {article['source']}")
-            
-            offset += len(articles)
+                # Keep every worker busy without reading far ahead of the saves
+                if len(in_flight) >= EMBEDDING_MAX_WORKERS:
+                    processed_count += self._save_embedded_page(*in_flight.popleft(), source, collection_name)
+                
+                if len(articles) < batch_limit:
+                    break
             
-            if len(articles) < batch_limit:
-                break
+            while in_flight:
+                processed_count += self._save_embedded_page(*in_flight.popleft(), source, collection_name)
                 
-        print(f"Successfully processed {processed_count} articles from {source}")
+        log.info("Successfully processed %d articles from %s", processed_count, source)
         return processed_count
 
     def search_similar_articles(self, query_text, source='multifamilydive', limit=5):
@@ -256,7 +434,7 @@ class QdrantEmbedding:
             List of dictionaries containing similar articles
         """
         if source not in self.collections:
-            print(f"Unknown source: {source}")
+            log.error("Unknown source: %s", source)
             return []
             
         collection_name = self.collections[source]
@@ -272,7 +450,14 @@ class QdrantEmbedding:
             search_results = self.qdrant.search(
                 collection_name=collection_name,
                 query_vector=query_embedding,
-                limit=limit
+                limit=limit,
+                # Search the int8 vectors, then rescore the top candidates with the originals
+                search_params=models.SearchParams(
+                    quantization=models.QuantizationSearchParams(
+                        rescore=True,
+                        oversampling=2.0
+                    )
+                )
             )
             
             # Format the results
@@ -293,12 +478,13 @@ class QdrantEmbedding:
             
             return similar_articles
         except Exception as e:
-            print(f"Error searching similar articles: {str(e)}")
+            log.error("Error searching similar articles: %s", e)
             return []
 
     def close(self):
-        """Close database connection"""
+        """Close database connection and the OpenAI HTTP client"""
         self.db.disconnect()
+        self.http_client.close()
 
 def main():
     """Main function for command line usage"""
@@ -314,6 +500,8 @@ def main():
     parser.add_argument("--search-limit", type=int, default=5, help="Maximum number of search results")
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # Create vector embedding processor
     qdrant_processor = QdrantEmbedding()
     
@@ -339,6 +527,7 @@ def main():
     finally:
         # Close database connection
         qdrant_processor.close()
+        close_all_pools()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,14 @@
 import os
 import json
+import asyncio
+import logging
 import argparse
 from dotenv import load_dotenv
 from scrape_multifamilydive import MultifamilydiveScraper
 from scrape_credaily import CredailyScraper
 from scrape_multihousing import MultihousingScraper
+from db_connector import DatabaseConnector, close_all_pools
+import async_db_connector
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,6 +24,85 @@ def load_json_data(filepath):
         print(f"Error loading data from {filepath}: {str(e)}")
         return []
 
+async def _insert_async(data, db_config, source):
+    """Insert articles through an asyncpg pool"""
+    pool = await async_db_connector.create_pool(db_config)
+    try:
+        return await getattr(async_db_connector, f"insert_{source}_articles")(pool, data)
+    finally:
+        await pool.close()
+
+def insert_with_asyncpg(data, db_config, source):
+    """Save articles to PostgreSQL using pipelined asyncpg inserts
+    
+    Args:
+        data: List of article dictionaries
+        db_config: Dictionary with keys host, database, user, password, port
+        source: Source name (multifamilydive, credaily, multihousing)
+    """
+    # Tables are created through the regular connector
+    db = DatabaseConnector(
+        host=db_config.get('host'),
+        database=db_config.get('database'),
+        user=db_config.get('user'),
+        password=db_config.get('password'),
+        port=db_config.get('port', 5432)
+    )
+    if not db.connect():
+        print("Failed to connect to database. Articles not saved.")
+        return
+    try:
+        getattr(db, f"create_{source}_table")()
+    finally:
+        db.disconnect()
+    
+    success_count = asyncio.run(_insert_async(data, db_config, source))
+    print(f"Saved {success_count} out of {len(data)} articles to PostgreSQL database")
+
+def process_files(args, db_config, db=None):
+    """Load each JSON file given on the command line and save it to PostgreSQL
+    
+    Args:
+        args: Parsed command line arguments
+        db_config: Dictionary with keys host, database, user, password, port
+        db: Optional connected DatabaseConnector shared by all three sources
+    """
+    # Process MultifamilyDive data
+    if args.multifamily_file:
+        if os.path.exists(args.multifamily_file):
+            multifamily_data = load_json_data(args.multifamily_file)
+            if multifamily_data and args.use_asyncpg:
+                insert_with_asyncpg(multifamily_data, db_config, 'multifamilydive')
+            elif multifamily_data:
+                scraper = MultifamilydiveScraper()
+                scraper.save_to_postgres(multifamily_data, db_config, db=db)
+        else:
+            print(f"MultifamilyDive file not found: {args.multifamily_file}")
+    
+    # Process CRE Daily data
+    if args.credaily_file:
+        if os.path.exists(args.credaily_file):
+            credaily_data = load_json_data(args.credaily_file)
+            if credaily_data and args.use_asyncpg:
+                insert_with_asyncpg(credaily_data, db_config, 'credaily')
+            elif credaily_data:
+                scraper = CredailyScraper()
+                scraper.save_to_postgres(credaily_data, db_config, db=db)
+        else:
+            print(f"CRE Daily file not found: {args.credaily_file}")
+            
+    # Process Multihousing data
+    if args.multihousing_file:
+        if os.path.exists(args.multihousing_file):
+            multihousing_data = load_json_data(args.multihousing_file)
+            if multihousing_data and args.use_asyncpg:
+                insert_with_asyncpg(multihousing_data, db_config, 'multihousing')
+            elif multihousing_data:
+                scraper = MultihousingScraper()
+                scraper.save_to_postgres(multihousing_data, db_config, db=db)
+        else:
+            print(f"Multihousing file not found: {args.multihousing_file}")
+
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Save scraped data to AWS PostgreSQL database')
@@ -31,9 +114,20 @@ def main():
     parser.add_argument('--user', type=str, help='Database user (overrides .env)')
     parser.add_argument('--password', type=str, help='Database password (overrides .env)')
     parser.add_argument('--port', type=int, help='Database port (overrides .env)')
+    parser.add_argument('--use-asyncpg', action='store_true', help='Insert articles with pipelined asyncpg instead of psycopg2')
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    if args.use_asyncpg:
+        # uvloop is optional; fall back to the default asyncio loop without it
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+    
     # Database configuration - use command line args if provided, otherwise use environment variables
     db_config = {
         'host': args.host or os.getenv('DB_HOST'),
@@ -52,35 +146,29 @@ def main():
         print("Please provide these settings via command line arguments or .env file")
         return
     
-    # Process MultifamilyDive data
-    if args.multifamily_file:
-        if os.path.exists(args.multifamily_file):
-            multifamily_data = load_json_data(args.multifamily_file)
-            if multifamily_data:
-                scraper = MultifamilydiveScraper()
-                scraper.save_to_postgres(multifamily_data, db_config)
-        else:
-            print(f"MultifamilyDive file not found: {args.multifamily_file}")
+    if args.use_asyncpg:
+        try:
+            process_files(args, db_config)
+        finally:
+            close_all_pools()
+        return
     
-    # Process CRE Daily data
-    if args.credaily_file:
-        if os.path.exists(args.credaily_file):
-            credaily_data = load_json_data(args.credaily_file)
-            if credaily_data:
-                scraper = CredailyScraper()
-                scraper.save_to_postgres(credaily_data, db_config)
-        else:
-            print(f"CRE Daily file not found: {args.credaily_file}")
-            
-    # Process Multihousing data
-    if args.multihousing_file:
-        if os.path.exists(args.multihousing_file):
-            multihousing_data = load_json_data(args.multihousing_file)
-            if multihousing_data:
-                scraper = MultihousingScraper()
-                scraper.save_to_postgres(multihousing_data, db_config)
-        else:
-            print(f"Multihousing file not found: {args.multihousing_file}")
+    # One connection serves all three sources instead of reconnecting for each
+    db = DatabaseConnector(
+        host=db_config.get('host'),
+        database=db_config.get('database'),
+        user=db_config.get('user'),
+        password=db_config.get('password'),
+        port=db_config.get('port', 5432)
+    )
+    if not db.connect():
+        print("Failed to connect to database. Articles not saved.")
+        return
+    try:
+        process_files(args, db_config, db)
+    finally:
+        db.disconnect()
+        close_all_pools()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
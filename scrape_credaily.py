@@ -1,8 +1,42 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import json
-from db_connector import DatabaseConnector
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+from selectolax.lexbor import LexborHTMLParser
+import re
+import csv
+import orjson
+from db_connector import DatabaseConnector, COPY_THRESHOLD, chunked
+
+# Article content only ever lives inside <body>, so skip building <head>
+_CONTENT_STRAINER = SoupStrainer('body')
+
+# Class name every listing item carries; used as a cheap pre-check
+_LISTING_MARKER = 'c-brief-list__item'
+
+# Pagination links on listing pages; the group is the page number
+_PAGE_LINK_PATTERN = re.compile(r'href="[^"]*?[?&](?:amp;)?pg=(\d+)')
+
+# Listing page selectors
+_LINK_SELECTOR_ITEMS = 'div.c-brief-list__item'
+_LINK_SELECTOR_TITLE = 'h5.c-brief-list__item-title a'
+_LINK_SELECTOR_SUMMARY = 'p.c-brief-list__item-text'
+_LINK_SELECTOR_AUTHOR = 'div.c-brief-list__item-author'
+_LINK_SELECTOR_DATE = 'div.c-brief-list__item-date'
+_LINK_SELECTOR_CATEGORIES = 'div.c-brief-list__item-category'
+_LINK_SELECTOR_CATEGORY = 'a.c-articles__category'
+
+# Page chrome removed before the last-resort paragraph sweep
+_CHROME_SELECTOR = soupsieve.compile('header, footer, nav, aside')
+_MAIN_CHROME_SELECTOR = soupsieve.compile('header, nav, aside')
+
+# Brief content containers, most specific first, compiled once
+_CONTENT_SELECTORS = tuple(soupsieve.compile(selector) for selector in (
+    'div.c-article__content',
+    'div.c-article__body',
+    'main#main-content',
+))
+
+# Write buffer for CSV/JSON output, so large saves flush in few syscalls
+_OUTPUT_BUFFER_SIZE = 1 << 20
 
 class CredailyScraper:
     
@@ -11,35 +45,37 @@ class CredailyScraper:
         
     def parse_brief_links(self, html_content, page_num):
         """Parse brief links from HTML content"""
+        # Pages without a single listing item (e.g. past the last page) need no parsing
+        if _LISTING_MARKER not in html_content:
+            return []
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            brief_items = soup.find_all('div', class_='c-brief-list__item')
+            tree = LexborHTMLParser(html_content)
             
             links = []
-            for item in brief_items:
-                title_element = item.find('h5', class_='c-brief-list__item-title')
-                if title_element and title_element.find('a'):
-                    link = title_element.find('a')['href']
-                    title = title_element.find('a').text.strip()
+            for item in tree.css(_LINK_SELECTOR_ITEMS):
+                title_link = item.css_first(_LINK_SELECTOR_TITLE)
+                if title_link:
+                    link = title_link.attributes['href']
+                    title = title_link.text().strip()
                     
                     # Extract brief summary
-                    summary_element = item.find('p', class_='c-brief-list__item-text')
-                    summary = summary_element.text.strip() if summary_element else ""
+                    summary_element = item.css_first(_LINK_SELECTOR_SUMMARY)
+                    summary = summary_element.text().strip() if summary_element else ""
                     
                     # Extract author
-                    author_element = item.find('div', class_='c-brief-list__item-author')
-                    author = author_element.text.replace('By', '').strip() if author_element else ""
+                    author_element = item.css_first(_LINK_SELECTOR_AUTHOR)
+                    author = author_element.text().replace('By', '').strip() if author_element else ""
                     
                     # Extract date
-                    date_element = item.find('div', class_='c-brief-list__item-date')
-                    date = date_element.text.strip() if date_element else ""
+                    date_element = item.css_first(_LINK_SELECTOR_DATE)
+                    date = date_element.text().strip() if date_element else ""
                     
                     # Extract categories
-                    categories_element = item.find('div', class_='c-brief-list__item-category')
+                    categories_element = item.css_first(_LINK_SELECTOR_CATEGORIES)
                     categories = []
                     if categories_element:
-                        category_links = categories_element.find_all('a', class_='c-articles__category')
-                        categories = [cat.text.strip() for cat in category_links]
+                        category_links = categories_element.css(_LINK_SELECTOR_CATEGORY)
+                        categories = [cat.text().strip() for cat in category_links]
                     
                     links.append({
                         'link': link,
@@ -54,41 +90,47 @@ class CredailyScraper:
             print(f"Error parsing brief links from page {page_num}: {str(e)}")
             return []
     
+    def parse_last_page(self, html_content):
+        """Return the highest page number linked from a listing page's pagination
+        
+        Args:
+            html_content: HTML of a listing page
+            
+        Returns:
+            Highest linked page number, or 0 if the page links to no other pages
+        """
+        return max((int(match.group(1)) for match in _PAGE_LINK_PATTERN.finditer(html_content)), default=0)
+    
     def parse_brief_content(self, html_content, brief_info):
-        """Parse the content from a brief page HTML"""
+        """Parse the content from a brief page HTML
+        
+        Args:
+            html_content: HTML of the brief page
+            brief_info: Link dictionary from the listing parser; updated in place
+        
+        Returns:
+            The same brief_info dictionary with 'content' filled in
+        """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, 'lxml', parse_only=_CONTENT_STRAINER)
             
-            # Try multiple potential content selectors
+            # Try the known content containers in priority order: the article
+            # content div, the article body, then the main content area. Only
+            # the first match of each is used, and an empty result falls through
             content = ""
-            
-            # First try the article content div
-            content_element = soup.find('div', class_='c-article__content')
-            if content_element:
-                paragraphs = content_element.find_all('p')
-                if paragraphs:
-                    content = ' '.join([p.text.strip() for p in paragraphs])
-            
-            # If content is still empty, try the brief text section
-            if not content:
-                # Try the article body section
-                article_body = soup.find('div', class_='c-article__body')
-                if article_body:
-                    paragraphs = article_body.find_all('p')
-                    if paragraphs:
-                        content = ' '.join([p.text.strip() for p in paragraphs])
-            
-            # If content is still empty, try another approach - look for the main content area
-            if not content:
-                main_content = soup.find('main', id='main-content')
-                if main_content:
+            for selector in _CONTENT_SELECTORS:
+                container = selector.select_one(soup)
+                if container is None:
+                    continue
+                if container.name == 'main':
                     # Exclude header elements
-                    for header in main_content.find_all(['header', 'nav', 'aside']):
-                        header.decompose()
-                    
-                    paragraphs = main_content.find_all('p')
-                    if paragraphs:
-                        content = ' '.join([p.text.strip() for p in paragraphs])
+                    for element in _MAIN_CHROME_SELECTOR.select(container):
+                        element.decompose()
+                
+                paragraphs = container.find_all('p')
+                content = ' '.join(p.get_text().strip() for p in paragraphs)
+                if content:
+                    break
             
             # If still no content, try to find any div with text that might be the article
             if not content:
@@ -97,32 +139,29 @@ class CredailyScraper:
                 for div in article_divs:
                     paragraphs = div.find_all('p')
                     if paragraphs and len(paragraphs) >= 2:  # Minimum 2 paragraphs to be considered content
-                        content = ' '.join([p.text.strip() for p in paragraphs])
+                        content = ' '.join(p.get_text().strip() for p in paragraphs)
                         break
             
             # Final fallback - just get any paragraphs from the body
             if not content:
-                body = soup.find('body')
+                body = soup.body
                 if body:
                     # Exclude header, footer, nav elements
-                    for element in body.find_all(['header', 'footer', 'nav', 'aside']):
+                    for element in _CHROME_SELECTOR.select(body):
                         element.decompose()
                     
                     paragraphs = body.find_all('p')
                     # Filter out very short paragraphs that might be navigation/metadata
-                    content_paragraphs = [p.text.strip() for p in paragraphs if len(p.text.strip()) > 40]
-                    if content_paragraphs:
-                        content = ' '.join(content_paragraphs)
+                    texts = (p.get_text().strip() for p in paragraphs)
+                    content = ' '.join(text for text in texts if len(text) > 40)
             
-            brief_info_copy = brief_info.copy()
-            brief_info_copy['content'] = content
-            return brief_info_copy
+            brief_info['content'] = content
+            return brief_info
             
         except Exception as e:
             print(f"Error parsing content from {brief_info.get('link', 'unknown URL')}: {str(e)}")
-            brief_info_copy = brief_info.copy()
-            brief_info_copy['content'] = ""
-            return brief_info_copy
+            brief_info['content'] = ""
+            return brief_info
     
     def save_to_csv(self, briefs_data, filename="credaily_articles.csv"):
         """Save briefs data to CSV"""
@@ -130,8 +169,12 @@ class CredailyScraper:
             print("No data to save")
             return
         
-        df = pd.DataFrame(briefs_data)
-        df.to_csv(filename, index=False)
+        # Union of keys across rows, in first-seen order (like a DataFrame's columns)
+        fieldnames = list(dict.fromkeys(key for row in briefs_data for key in row))
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=_OUTPUT_BUFFER_SIZE) as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(briefs_data)
         print(f"Saved {len(briefs_data)} briefs to {filename}")
     
     def save_to_json(self, briefs_data, filename="credaily_articles.json"):
@@ -140,42 +183,54 @@ class CredailyScraper:
             print("No data to save")
             return
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(briefs_data, f, ensure_ascii=False, indent=4)
+        # orjson writes UTF-8 bytes directly, non-ASCII text included
+        with open(filename, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(briefs_data))
         print(f"Saved {len(briefs_data)} briefs to {filename}")
     
-    def save_to_postgres(self, briefs_data, db_config):
+    def save_to_postgres(self, briefs_data, db_config, db=None):
         """Save briefs data to PostgreSQL database
         
         Args:
             briefs_data: List of article dictionaries
             db_config: Dictionary with keys host, database, user, password, port
+            db: Optional already-connected DatabaseConnector to reuse. The caller
+                keeps ownership of it, so it is left connected afterwards
         """
         if not briefs_data:
             print("No data to save to database")
             return
         
-        # Create database connector
-        db = DatabaseConnector(
-            host=db_config.get('host'),
-            database=db_config.get('database'),
-            user=db_config.get('user'),
-            password=db_config.get('password'),
-            port=db_config.get('port', 5432)
-        )
+        owns_connection = db is None
+        if owns_connection:
+            # Create database connector
+            db = DatabaseConnector(
+                host=db_config.get('host'),
+                database=db_config.get('database'),
+                user=db_config.get('user'),
+                password=db_config.get('password'),
+                port=db_config.get('port', 5432)
+            )
+            
+            # Connect to database
+            if not db.connect():
+                print("Failed to connect to database. Articles not saved.")
+                return
         
-        # Connect to database
-        if db.connect():
-            try:
-                # Create table if it doesn't exist
-                db.create_credaily_table()
-                
-                # Insert articles
-                success_count = db.insert_credaily_articles(briefs_data)
-                
-                print(f"Saved {success_count} out of {len(briefs_data)} articles to PostgreSQL database")
-            finally:
-                # Ensure connection is closed
-                db.disconnect()
-        else:
-            print("Failed to connect to database. Articles not saved.") 
\ No newline at end of file
+        try:
+            # Create table if it doesn't exist
+            db.create_credaily_table()
+            
+            # Insert articles chunk by chunk, streaming large chunks with COPY
+            success_count = 0
+            for chunk in chunked(briefs_data):
+                if len(chunk) > COPY_THRESHOLD:
+                    success_count += db.copy_credaily_articles(chunk)
+                else:
+                    success_count += db.insert_credaily_articles(chunk)
+            
+            print(f"Saved {success_count} out of {len(briefs_data)} articles to PostgreSQL database")
+        finally:
+            # Only close connections this method opened
+            if owns_connection:
+                db.disconnect() 
\ No newline at end of file
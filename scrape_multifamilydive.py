@@ -1,8 +1,32 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import json
-from db_connector import DatabaseConnector
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+from selectolax.lexbor import LexborHTMLParser
+import re
+import csv
+import orjson
+from db_connector import DatabaseConnector, COPY_THRESHOLD, chunked
+
+# Article content only ever lives inside <body>, so skip building <head>
+_CONTENT_STRAINER = SoupStrainer('body')
+
+# Class name every listing item carries; used as a cheap pre-check
+_LISTING_MARKER = 'feed__item'
+
+# Pagination links on listing pages; the group is the page number
+_PAGE_LINK_PATTERN = re.compile(r'href="[^"]*?[?&](?:amp;)?page=(\d+)')
+
+# Listing page selectors
+_LINK_SELECTOR_ITEMS = 'li.feed__item:not(.feed-item-ad)'
+_LINK_SELECTOR_TITLE = 'h3.feed__title a'
+_LINK_SELECTOR_SUMMARY = 'p.feed__description'
+_LINK_SELECTOR_LABEL = 'span.label'
+
+# Page chrome removed before the last-resort paragraph sweep
+_CHROME_SELECTOR = soupsieve.compile('header, footer, nav, aside')
+_MAIN_CHROME_SELECTOR = soupsieve.compile('header, nav, aside')
+
+# Write buffer for CSV/JSON output, so large saves flush in few syscalls
+_OUTPUT_BUFFER_SIZE = 1 << 20
 
 class MultifamilydiveScraper:
     
@@ -11,32 +35,30 @@ class MultifamilydiveScraper:
         
     def parse_article_links(self, html_content, page_num):
         """Parse article links from HTML content"""
+        # Pages without a single listing item (e.g. past the last page) need no parsing
+        if _LISTING_MARKER not in html_content:
+            return []
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            # Find all feed items
-            article_items = soup.find_all('li', class_='feed__item')
+            tree = LexborHTMLParser(html_content)
             
             links = []
-            for item in article_items:
-                # Skip ad items
-                if 'feed-item-ad' in item.get('class', []):
-                    continue
-                
+            # Find all feed items, skipping ad items
+            for item in tree.css(_LINK_SELECTOR_ITEMS):
                 # Find the title and link
-                title_element = item.find('h3', class_='feed__title')
-                if title_element and title_element.find('a'):
-                    link = title_element.find('a')['href']
+                title_link = item.css_first(_LINK_SELECTOR_TITLE)
+                if title_link:
+                    link = title_link.attributes['href']
                     if not link.startswith('http'):
                         link = 'https://www.multifamilydive.com' + link
-                    title = title_element.find('a').text.strip()
+                    title = title_link.text().strip()
                     
                     # Extract description
-                    desc_element = item.find('p', class_='feed__description')
-                    summary = desc_element.text.strip() if desc_element else ""
+                    desc_element = item.css_first(_LINK_SELECTOR_SUMMARY)
+                    summary = desc_element.text().strip() if desc_element else ""
                     
                     # Extract label/category if available
-                    label_element = item.find('span', class_='label')
-                    category = label_element.text.strip() if label_element else ""
+                    label_element = item.css_first(_LINK_SELECTOR_LABEL)
+                    category = label_element.text().strip() if label_element else ""
                     
                     # Add to links
                     links.append({
@@ -54,11 +76,29 @@ class MultifamilydiveScraper:
             print(f"Error parsing article links from page {page_num}: {str(e)}")
             return []
     
+    def parse_last_page(self, html_content):
+        """Return the highest page number linked from a listing page's pagination
+        
+        Args:
+            html_content: HTML of a listing page
+            
+        Returns:
+            Highest linked page number, or 0 if the page links to no other pages
+        """
+        return max((int(match.group(1)) for match in _PAGE_LINK_PATTERN.finditer(html_content)), default=0)
+    
     def parse_article_content(self, html_content, article_info):
-        """Parse the content from a article page HTML"""
+        """Parse the content from a article page HTML
+        
+        Args:
+            html_content: HTML of the article page
+            article_info: Link dictionary from the listing parser; updated in place
+        
+        Returns:
+            The same article_info dictionary with 'content' filled in
+        """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            article_info_copy = article_info.copy()
+            soup = BeautifulSoup(html_content, 'lxml', parse_only=_CONTENT_STRAINER)
             
             # Extract article content
             content = ""
@@ -72,24 +112,24 @@ class MultifamilydiveScraper:
                     # Extract author name from the anchor tag
                     author_link = author_element.find('a', rel='author')
                     if author_link:
-                        article_info_copy['author'] = author_link.text.strip()
+                        article_info['author'] = author_link.text.strip()
                     
                     # Extract author title if available
                     author_title = author_element.find('span', class_='author-title')
                     if author_title:
-                        article_info_copy['author_title'] = author_title.text.strip()
+                        article_info['author_title'] = author_title.text.strip()
                 else:
                     # Fallback to original method
                     byline_element = article_container.find('div', class_='article__byline')
                     if byline_element:
                         author = byline_element.text.strip()
-                        article_info_copy['author'] = author
+                        article_info['author'] = author
                 
                 # Get date if available
                 date_element = article_container.find('div', class_='date') or article_container.find('span', class_='published-info')
                 if date_element:
                     date = date_element.text.strip()
-                    article_info_copy['date'] = date
+                    article_info['date'] = date
                     
                 # Extract categories from the post-article-topics div
                 categories_div = soup.find('div', class_='post-article-topics')
@@ -99,7 +139,7 @@ class MultifamilydiveScraper:
                         categories = [link.text.strip().rstrip(',') for link in category_links]
                         # Only update if we found categories
                         if categories:
-                            article_info_copy['categories'] = categories
+                            article_info['categories'] = categories
                     
                 # Get article body content
                 body = article_container.find('div', class_='article-body')
@@ -110,7 +150,7 @@ class MultifamilydiveScraper:
                         
                     paragraphs = body.find_all('p')
                     if paragraphs:
-                        content = ' '.join([p.text.strip() for p in paragraphs])
+                        content = ' '.join(p.get_text().strip() for p in paragraphs)
             
             # If no content found, try alternative selectors
             if not content:
@@ -123,7 +163,7 @@ class MultifamilydiveScraper:
                     
                     paragraphs = article_body.find_all('p')
                     if paragraphs:
-                        content = ' '.join([p.text.strip() for p in paragraphs])
+                        content = ' '.join(p.get_text().strip() for p in paragraphs)
             
             # Final fallback - look for any content in the page
             if not content:
@@ -131,36 +171,34 @@ class MultifamilydiveScraper:
                 main_content = soup.find('main')
                 if main_content:
                     # Exclude header, nav, sidebar elements
-                    for element in main_content.find_all(['header', 'nav', 'aside']):
+                    for element in _MAIN_CHROME_SELECTOR.select(main_content):
                         element.decompose()
                     
                     paragraphs = main_content.find_all('p')
                     if paragraphs:
-                        content = ' '.join([p.text.strip() for p in paragraphs])
+                        content = ' '.join(p.get_text().strip() for p in paragraphs)
                 
                 # If still no content, try the whole body
                 if not content:
                     # Find all paragraphs in the body that might be content
-                    body = soup.find('body')
+                    body = soup.body
                     if body:
                         # Exclude header, footer, sidebar elements
-                        for element in body.find_all(['header', 'footer', 'aside', 'nav']):
+                        for element in _CHROME_SELECTOR.select(body):
                             element.decompose()
                             
                         # Get paragraphs with reasonable length
                         paragraphs = body.find_all('p')
-                        content_paragraphs = [p.text.strip() for p in paragraphs if len(p.text.strip()) > 40]
-                        if content_paragraphs:
-                            content = ' '.join(content_paragraphs)
+                        texts = (p.get_text().strip() for p in paragraphs)
+                        content = ' '.join(text for text in texts if len(text) > 40)
             
-            article_info_copy['content'] = content
-            return article_info_copy
+            article_info['content'] = content
+            return article_info
             
         except Exception as e:
             print(f"Error parsing content from {article_info.get('link', 'unknown URL')}: {str(e)}")
-            article_info_copy = article_info.copy()
-            article_info_copy['content'] = ""
-            return article_info_copy
+            article_info['content'] = ""
+            return article_info
     
     def save_to_csv(self, articles_data, filename="multifamilydive_articles.csv"):
         """Save articles data to CSV"""
@@ -168,8 +206,12 @@ class MultifamilydiveScraper:
             print("No data to save")
             return
         
-        df = pd.DataFrame(articles_data)
-        df.to_csv(filename, index=False)
+        # Union of keys across rows, in first-seen order (like a DataFrame's columns)
+        fieldnames = list(dict.fromkeys(key for row in articles_data for key in row))
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=_OUTPUT_BUFFER_SIZE) as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(articles_data)
         print(f"Saved {len(articles_data)} articles to {filename}")
     
     def save_to_json(self, articles_data, filename="multifamilydive_articles.json"):
@@ -178,42 +220,54 @@ class MultifamilydiveScraper:
             print("No data to save")
             return
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(articles_data, f, ensure_ascii=False, indent=4)
+        # orjson writes UTF-8 bytes directly, non-ASCII text included
+        with open(filename, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(articles_data))
         print(f"Saved {len(articles_data)} articles to {filename}")
     
-    def save_to_postgres(self, articles_data, db_config):
+    def save_to_postgres(self, articles_data, db_config, db=None):
         """Save articles data to PostgreSQL database
         
         Args:
             articles_data: List of article dictionaries
             db_config: Dictionary with keys host, database, user, password, port
+            db: Optional already-connected DatabaseConnector to reuse. The caller
+                keeps ownership of it, so it is left connected afterwards
         """
         if not articles_data:
             print("No data to save to database")
             return
         
-        # Create database connector
-        db = DatabaseConnector(
-            host=db_config.get('host'),
-            database=db_config.get('database'),
-            user=db_config.get('user'),
-            password=db_config.get('password'),
-            port=db_config.get('port', 5432)
-        )
+        owns_connection = db is None
+        if owns_connection:
+            # Create database connector
+            db = DatabaseConnector(
+                host=db_config.get('host'),
+                database=db_config.get('database'),
+                user=db_config.get('user'),
+                password=db_config.get('password'),
+                port=db_config.get('port', 5432)
+            )
+            
+            # Connect to database
+            if not db.connect():
+                print("Failed to connect to database. Articles not saved.")
+                return
         
-        # Connect to database
-        if db.connect():
-            try:
-                # Create table if it doesn't exist
-                db.create_multifamilydive_table()
-                
-                # Insert articles
-                success_count = db.insert_multifamilydive_articles(articles_data)
-                
-                print(f"Saved {success_count} out of {len(articles_data)} articles to PostgreSQL database")
-            finally:
-                # Ensure connection is closed
-                db.disconnect()
-        else:
-            print("Failed to connect to database. Articles not saved.") 
\ No newline at end of file
+        try:
+            # Create table if it doesn't exist
+            db.create_multifamilydive_table()
+            
+            # Insert articles chunk by chunk, streaming large chunks with COPY
+            success_count = 0
+            for chunk in chunked(articles_data):
+                if len(chunk) > COPY_THRESHOLD:
+                    success_count += db.copy_multifamilydive_articles(chunk)
+                else:
+                    success_count += db.insert_multifamilydive_articles(chunk)
+            
+            print(f"Saved {success_count} out of {len(articles_data)} articles to PostgreSQL database")
+        finally:
+            # Only close connections this method opened
+            if owns_connection:
+                db.disconnect() 
\ No newline at end of file
@@ -1,8 +1,34 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import json
-from db_connector import DatabaseConnector
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+from selectolax.lexbor import LexborHTMLParser
+import re
+import csv
+import orjson
+from db_connector import DatabaseConnector, COPY_THRESHOLD, chunked
+
+# Article content only ever lives inside <body>, so skip building <head>
+_CONTENT_STRAINER = SoupStrainer('body')
+
+# Class name every listing item carries; used as a cheap pre-check
+_LISTING_MARKER = 'cpe-posts-category-page'
+
+# Pagination links on listing pages; the group is the page number
+_PAGE_LINK_PATTERN = re.compile(r'href="[^"]*?/latest-news/page/(\d+)/?"')
+
+# Listing page selectors
+_LINK_SELECTOR_ITEMS = 'div.cpe-posts-category-page'
+_LINK_SELECTOR_TITLE = 'h2.fl-post-title a'
+_LINK_SELECTOR_SUMMARY = 'div.fl-post-excerpt p'
+_LINK_SELECTOR_META = 'div.fl-post-meta'
+_LINK_SELECTOR_META_SEP = 'span.fl-post-meta-sep'
+_LINK_SELECTOR_CATEGORIES = 'div.cpe-categories'
+_LINK_SELECTOR_IMAGE = 'div.fl-post-image img'
+
+# Page chrome removed before the last-resort paragraph sweep
+_CHROME_SELECTOR = soupsieve.compile('header, footer, nav, aside')
+
+# Write buffer for CSV/JSON output, so large saves flush in few syscalls
+_OUTPUT_BUFFER_SIZE = 1 << 20
 
 class MultihousingScraper:
     
@@ -11,50 +37,50 @@ class MultihousingScraper:
         
     def parse_brief_links(self, html_content, page_num):
         """Parse brief links from HTML content"""
+        # Pages without a single listing item (e.g. past the last page) need no parsing
+        if _LISTING_MARKER not in html_content:
+            return []
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            brief_items = soup.find_all('div', class_='cpe-posts-category-page')
+            tree = LexborHTMLParser(html_content)
             
             links = []
-            for item in brief_items:
+            for item in tree.css(_LINK_SELECTOR_ITEMS):
                 # Find the title and link
-                title_element = item.find('h2', class_='fl-post-title')
-                if title_element and title_element.find('a'):
-                    link = title_element.find('a')['href']
-                    title = title_element.find('a').text.strip()
+                title_link = item.css_first(_LINK_SELECTOR_TITLE)
+                if title_link:
+                    link = title_link.attributes['href']
+                    title = title_link.text().strip()
                     
                     # Extract brief summary
-                    summary_element = item.find('div', class_='fl-post-excerpt')
-                    summary = ""
-                    if summary_element and summary_element.find('p'):
-                        summary = summary_element.find('p').text.strip()
+                    summary_element = item.css_first(_LINK_SELECTOR_SUMMARY)
+                    summary = summary_element.text().strip() if summary_element else ""
                     
                     # Extract author and date
-                    meta_element = item.find('div', class_='fl-post-meta')
+                    meta_element = item.css_first(_LINK_SELECTOR_META)
                     author = ""
                     date = ""
                     if meta_element:
-                        author_element = meta_element.find('a')
-                        author = author_element.text.strip() if author_element else ""
+                        author_element = meta_element.css_first('a')
+                        author = author_element.text().strip() if author_element else ""
                         
                         # Date is the text after the separator
-                        if meta_element.find('span', class_='fl-post-meta-sep'):
-                            date_text = meta_element.contents[-1]
-                            if isinstance(date_text, str):
-                                date = date_text.strip()
+                        if meta_element.css_first(_LINK_SELECTOR_META_SEP):
+                            date_node = meta_element.last_child
+                            if date_node is not None and date_node.tag == '-text':
+                                date = date_node.text().strip()
                     
                     # Extract categories
-                    categories_element = item.find('div', class_='cpe-categories')
+                    categories_element = item.css_first(_LINK_SELECTOR_CATEGORIES)
                     categories = []
                     if categories_element:
-                        category_links = categories_element.find_all('a')
-                        categories = [cat.text.strip() for cat in category_links]
+                        category_links = categories_element.css('a')
+                        categories = [cat.text().strip() for cat in category_links]
                     
                     # Extract image if available
                     image_url = ""
-                    image_element = item.find('div', class_='fl-post-image')
-                    if image_element and image_element.find('img'):
-                        image_url = image_element.find('img')['src']
+                    image_element = item.css_first(_LINK_SELECTOR_IMAGE)
+                    if image_element:
+                        image_url = image_element.attributes.get('src') or ""
                     
                     links.append({
                         'link': link,
@@ -70,10 +96,29 @@ class MultihousingScraper:
             print(f"Error parsing brief links from page {page_num}: {str(e)}")
             return []
     
+    def parse_last_page(self, html_content):
+        """Return the highest page number linked from a listing page's pagination
+        
+        Args:
+            html_content: HTML of a listing page
+            
+        Returns:
+            Highest linked page number, or 0 if the page links to no other pages
+        """
+        return max((int(match.group(1)) for match in _PAGE_LINK_PATTERN.finditer(html_content)), default=0)
+    
     def parse_brief_content(self, html_content, brief_info):
-        """Parse the content from a brief page HTML"""
+        """Parse the content from a brief page HTML
+        
+        Args:
+            html_content: HTML of the brief page
+            brief_info: Link dictionary from the listing parser; updated in place
+        
+        Returns:
+            The same brief_info dictionary with 'content' filled in
+        """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, 'lxml', parse_only=_CONTENT_STRAINER)
             
             # Try multiple potential content selectors
             content = ""
@@ -122,35 +167,33 @@ class MultihousingScraper:
                 for element in content_elements:
                     # Get all paragraphs
                     for p in element.find_all('p'):
-                        if p.text.strip():
-                            paragraphs.append(p.text.strip())
+                        text = p.get_text().strip()
+                        if text:
+                            paragraphs.append(text)
                 
                 if paragraphs:
                     content = ' '.join(paragraphs)
             
             # Final fallback - just get any paragraphs from the body
             if not content:
-                body = soup.find('body')
+                body = soup.body
                 if body:
                     # Exclude header, footer, nav elements
-                    for element in body.find_all(['header', 'footer', 'nav', 'aside']):
+                    for element in _CHROME_SELECTOR.select(body):
                         element.decompose()
                     
                     paragraphs = body.find_all('p')
                     # Filter out very short paragraphs that might be navigation/metadata
-                    content_paragraphs = [p.text.strip() for p in paragraphs if len(p.text.strip()) > 40]
-                    if content_paragraphs:
-                        content = ' '.join(content_paragraphs)
+                    texts = (p.get_text().strip() for p in paragraphs)
+                    content = ' '.join(text for text in texts if len(text) > 40)
             
-            brief_info_copy = brief_info.copy()
-            brief_info_copy['content'] = content
-            return brief_info_copy
+            brief_info['content'] = content
+            return brief_info
             
         except Exception as e:
             print(f"Error parsing content from {brief_info.get('link', 'unknown URL')}: {str(e)}")
-            brief_info_copy = brief_info.copy()
-            brief_info_copy['content'] = ""
-            return brief_info_copy
+            brief_info['content'] = ""
+            return brief_info
     
     def save_to_csv(self, briefs_data, filename="multihousing_articles.csv"):
         """Save briefs data to CSV"""
@@ -158,8 +201,12 @@ class MultihousingScraper:
             print("No data to save")
             return
         
-        df = pd.DataFrame(briefs_data)
-        df.to_csv(filename, index=False)
+        # Union of keys across rows, in first-seen order (like a DataFrame's columns)
+        fieldnames = list(dict.fromkeys(key for row in briefs_data for key in row))
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=_OUTPUT_BUFFER_SIZE) as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(briefs_data)
         print(f"Saved {len(briefs_data)} briefs to {filename}")
     
     def save_to_json(self, briefs_data, filename="multihousing_articles.json"):
@@ -168,42 +215,54 @@ class MultihousingScraper:
             print("No data to save")
             return
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(briefs_data, f, ensure_ascii=False, indent=4)
+        # orjson writes UTF-8 bytes directly, non-ASCII text included
+        with open(filename, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(briefs_data))
         print(f"Saved {len(briefs_data)} briefs to {filename}")
     
-    def save_to_postgres(self, briefs_data, db_config):
+    def save_to_postgres(self, briefs_data, db_config, db=None):
         """Save briefs data to PostgreSQL database
         
         Args:
             briefs_data: List of article dictionaries
             db_config: Dictionary with keys host, database, user, password, port
+            db: Optional already-connected DatabaseConnector to reuse. The caller
+                keeps ownership of it, so it is left connected afterwards
         """
         if not briefs_data:
             print("No data to save to database")
             return
         
-        # Create database connector
-        db = DatabaseConnector(
-            host=db_config.get('host'),
-            database=db_config.get('database'),
-            user=db_config.get('user'),
-            password=db_config.get('password'),
-            port=db_config.get('port', 5432)
-        )
+        owns_connection = db is None
+        if owns_connection:
+            # Create database connector
+            db = DatabaseConnector(
+                host=db_config.get('host'),
+                database=db_config.get('database'),
+                user=db_config.get('user'),
+                password=db_config.get('password'),
+                port=db_config.get('port', 5432)
+            )
+            
+            # Connect to database
+            if not db.connect():
+                print("Failed to connect to database. Articles not saved.")
+                return
         
-        # Connect to database
-        if db.connect():
-            try:
-                # Create table if it doesn't exist
-                db.create_multihousing_table()
-                
-                # Insert articles
-                success_count = db.insert_multihousing_articles(briefs_data)
-                
-                print(f"Saved {success_count} out of {len(briefs_data)} articles to PostgreSQL database")
-            finally:
-                # Ensure connection is closed
-                db.disconnect()
-        else:
-            print("Failed to connect to database. Articles not saved.") 
\ No newline at end of file
+        try:
+            # Create table if it doesn't exist
+            db.create_multihousing_table()
+            
+            # Insert articles chunk by chunk, streaming large chunks with COPY
+            success_count = 0
+            for chunk in chunked(briefs_data):
+                if len(chunk) > COPY_THRESHOLD:
+                    success_count += db.copy_multihousing_articles(chunk)
+                else:
+                    success_count += db.insert_multihousing_articles(chunk)
+            
+            print(f"Saved {success_count} out of {len(briefs_data)} articles to PostgreSQL database")
+        finally:
+            # Only close connections this method opened
+            if owns_connection:
+                db.disconnect() 
\ No newline at end of file
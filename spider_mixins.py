@@ -0,0 +1,87 @@
+from w3lib.url import canonicalize_url
+from db_connector import DatabaseConnector
+from env_utils import load_env_file, get_db_config_from_env
+
+
+def _as_bool(value):
+    """Interpret command line strings such as 'true' or '0' as booleans"""
+    if isinstance(value, str):
+        return value.lower() in ('true', 'yes', '1', 't')
+    return value
+
+
+class SpiderDBMixin:
+    """Database settings and saved-article lookup shared by the news spiders
+
+    Spiders set articles_table to the PostgreSQL table their articles are saved to.
+    """
+    articles_table = None
+
+    # Settings parsed from the environment, per env file, shared by every spider in the process
+    _db_config_cache = {}
+
+    def _setup_db_config(self, kwargs):
+        """Set save_to_db and the db_* attributes from the environment, overridden by kwargs"""
+        env_path = kwargs.get('env_file')
+        db_config = SpiderDBMixin._db_config_cache.get(env_path)
+        if db_config is None:
+            # Load .env file if it exists
+            load_env_file(env_path)
+            db_config = SpiderDBMixin._db_config_cache[env_path] = get_db_config_from_env()
+
+        # Override with any explicit kwargs (command line args take precedence)
+        self.save_to_db = _as_bool(kwargs.get('save_to_db', db_config['save_to_db']))
+        self.db_host = kwargs.get('db_host', db_config['host'])
+        self.db_name = kwargs.get('db_name', db_config['database'])
+        self.db_user = kwargs.get('db_user', db_config['user'])
+        self.db_password = kwargs.get('db_password', db_config['password'])
+        self.db_port = kwargs.get('db_port', db_config['port'])
+
+        if self.save_to_db:
+            self.logger.info("Database saving is enabled")
+            if self.db_config():
+                self.logger.info(f"Using database host: {self.db_host}, database: {self.db_name}")
+            else:
+                self.logger.warning("Missing some database settings. Check your .env file or command line arguments.")
+
+    def db_config(self):
+        """Return the database settings, or None if a required one is missing"""
+        if not all([self.db_host, self.db_name, self.db_user, self.db_password]):
+            return None
+        return {
+            'host': self.db_host,
+            'database': self.db_name,
+            'user': self.db_user,
+            'password': self.db_password,
+            'port': int(self.db_port) if isinstance(self.db_port, str) else self.db_port
+        }
+
+    def load_saved_links(self):
+        """Return the links already saved in this spider's PostgreSQL table"""
+        db_config = self.db_config()
+        if db_config is None:
+            return []
+        db = DatabaseConnector(
+            host=db_config.get('host'),
+            database=db_config.get('database'),
+            user=db_config.get('user'),
+            password=db_config.get('password'),
+            port=db_config.get('port', 5432)
+        )
+        if not db.connect():
+            return []
+        try:
+            return db.get_article_links(self.articles_table)
+        finally:
+            db.disconnect()
+
+    def _setup_seen_urls(self, kwargs):
+        """Start the set of canonical article URLs already requested (or already saved)
+
+        Each article page is then fetched once even if it shows up on several
+        listing pages. Pass skip_saved=false to refetch articles already saved.
+        """
+        self.seen_urls = set()
+        if self.save_to_db and _as_bool(kwargs.get('skip_saved', True)) and self.db_config():
+            self.seen_urls.update(canonicalize_url(link) for link in self.load_saved_links())
+            self.logger.info(f"Skipping {len(self.seen_urls)} articles already in the database")
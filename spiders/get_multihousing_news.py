@@ -7,60 +7,59 @@ import argparse
 # Add parent directory to path to import scrape_credaily
 sys.path.append(str(Path(__file__).parent.parent))
 from scrape_multihousing import MultihousingScraper
-from env_utils import load_env_file, get_db_config_from_env
+from spider_mixins import SpiderDBMixin
+from w3lib.url import canonicalize_url
 
-class NewsSpider(scrapy.Spider):
+class NewsSpider(SpiderDBMixin, scrapy.Spider):
     name = "multihousing_news"
     start_urls = ["https://www.multihousingnews.com/latest-news/page/101/"]  
     
+    # Table the articles are saved to (see SpiderDBMixin)
+    articles_table = 'multihousing_articles'
+    
+    # Output files are <output_prefix>_articles.csv and .json (see FilePipeline)
+    output_prefix = 'multihousing'
+    
     def __init__(self, *args, **kwargs):
         super(NewsSpider, self).__init__(*args, **kwargs)
         self.scraper = MultihousingScraper()
         self.page_limit = kwargs.get('page_limit', 200)
         self.brief_links = []
-        self.collected_data = []
-        
-        # Load .env file if it exists
-        env_path = kwargs.get('env_file')
-        load_env_file(env_path)
-        
-        # Get database config from environment variables or kwargs
-        db_config = get_db_config_from_env()
-        
-        # Override with any explicit kwargs (command line args take precedence)
-        self.save_to_db = kwargs.get('save_to_db', db_config['save_to_db'])
-        if isinstance(self.save_to_db, str):
-            self.save_to_db = self.save_to_db.lower() in ('true', 'yes', '1', 't')
-            
-        self.db_host = kwargs.get('db_host', db_config['host'])
-        self.db_name = kwargs.get('db_name', db_config['database'])
-        self.db_user = kwargs.get('db_user', db_config['user'])
-        self.db_password = kwargs.get('db_password', db_config['password'])
-        self.db_port = kwargs.get('db_port', db_config['port'])
-        
-        if self.save_to_db:
-            self.logger.info("Database saving is enabled")
-            if all([self.db_host, self.db_name, self.db_user, self.db_password]):
-                self.logger.info(f"Using database host: {self.db_host}, database: {self.db_name}")
-            else:
-                self.logger.warning("Missing some database settings. Check your .env file or command line arguments.")
         
+        self._setup_db_config(kwargs)
+        self._setup_seen_urls(kwargs)
+
     def start_requests(self):  
         start_page = 101
-        end_page = int(self.page_limit)
+        self.end_page = int(self.page_limit)
         
-        for page in range(start_page, end_page + 1):
-            self.logger.info(f"Requesting page {page}")
-            yield scrapy.Request(  
-                url=f'https://www.multihousingnews.com/latest-news/page/{page}/',
-                callback=self.parse_brief_list,  
-                meta={  
-                    'zyte_api': {
-                        'browserHtml': True
-                    },
-                    'page_num': page
-                }  
-            )
+        # Only the first page is requested up front; later pages are scheduled
+        # from the pagination links, so pages that do not exist are never requested
+        self.last_scheduled_page = start_page
+        yield self.listing_request(start_page)
+    
+    def listing_request(self, page):
+        """Build the request for one listing page"""
+        self.logger.info(f"Requesting page {page}")
+        return scrapy.Request(  
+            url=f'https://www.multihousingnews.com/latest-news/page/{page}/',
+            callback=self.parse_brief_list,  
+            meta={  
+                'zyte_api': {
+                    'browserHtml': True
+                },
+                'page_num': page
+            }  
+        )
+    
+    def schedule_linked_pages(self, response):
+        """Request listing pages linked from this one that are not scheduled yet"""
+        last_page = min(self.scraper.parse_last_page(response.text), self.end_page)
+        first_page = self.last_scheduled_page + 1
+        # Claim the pages before yielding, as Scrapy may interleave callback generators
+        self.last_scheduled_page = max(self.last_scheduled_page, last_page)
+        for page in range(first_page, last_page + 1):
+            yield self.listing_request(page)
 
     def parse_brief_list(self, response):
         """Parse the list of briefs on a page"""
@@ -73,6 +72,12 @@ class NewsSpider(scrapy.Spider):
         
         # Process each brief
         for brief in brief_links:
+            # Skip briefs already requested from another listing page or saved earlier
+            canonical_url = canonicalize_url(brief['link'])
+            if canonical_url in self.seen_urls:
+                continue
+            self.seen_urls.add(canonical_url)
+            
             # Request the content page for each brief
             yield scrapy.Request(
                 url=brief['link'],
@@ -84,6 +89,8 @@ class NewsSpider(scrapy.Spider):
                     'brief_info': brief
                 }
             )
+        
+        yield from self.schedule_linked_pages(response)
     
     def parse_brief_content(self, response):
         """Parse the content of an individual brief"""
@@ -92,33 +99,10 @@ class NewsSpider(scrapy.Spider):
         # Use MultihousingScraper to parse content from response text
         brief_with_content = self.scraper.parse_brief_content(response.text, brief_info)
         
-        # Add to collected data
-        self.collected_data.append(brief_with_content)
-        
-        # Return the item
+        # Return the item; the pipelines save it
         return brief_with_content
     
     def closed(self, reason):
         """Called when spider is closed"""
         self.logger.info(f"Spider closed: {reason}")
-        self.logger.info(f"Total briefs collected: {len(self.collected_data)}")
-        
-        # Save the collected data
-        if self.collected_data:
-            output_prefix = 'multihousing'
-            self.scraper.save_to_csv(self.collected_data, f"{output_prefix}_articles.csv")
-            self.scraper.save_to_json(self.collected_data, f"{output_prefix}_articles.json")
-            
-            # Save to PostgreSQL if configured
-            if self.save_to_db and self.db_host and self.db_name and self.db_user and self.db_password:
-                self.logger.info("Saving data to PostgreSQL database")
-                db_config = {
-                    'host': self.db_host,
-                    'database': self.db_name,
-                    'user': self.db_user,
-                    'password': self.db_password,
-                    'port': int(self.db_port) if isinstance(self.db_port, str) else self.db_port
-                }
-                self.scraper.save_to_postgres(self.collected_data, db_config)
-            elif self.save_to_db:
-                self.logger.error("Database saving enabled but missing database configuration")
+        self.logger.info(f"Total briefs collected: {self.crawler.stats.get_value('item_scraped_count', 0)}")
@@ -1,19 +1,53 @@
 # vector_embedding.py - New file for vector embedding functionality
 
+import io
 import os
-from dotenv import load_dotenv
+import asyncio
+from itertools import islice
 import numpy as np
-import pandas as pd
-import openai
-from db_connector import DatabaseConnector
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from pgvector.psycopg2 import register_vector
+from db_connector import DatabaseConnector, close_all_pools
 from env_utils import load_env_file, get_db_config_from_env
+from embedding_utils import batch_by_tokens
 from psycopg2 import sql
+from psycopg2.extras import execute_values
 
 # Load environment variables
 load_env_file()
 
-# Set OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# OpenAI API key
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Embedding model, shortened to EMBEDDING_DIMENSION values and stored as halfvec
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSION = 384
+
+# Characters of article text read from the database; comfortably covers the
+# model's token limit, which batch_by_tokens then enforces exactly
+EMBEDDING_TEXT_MAX_CHARS = 32768
+
+# Vector literal for COPY rows, formatted in one % operation rather than one
+# str() per float; 5 significant digits round-trip the float16 values halfvec stores
+_VECTOR_FORMAT = '[' + ','.join(['%.5g'] * EMBEDDING_DIMENSION) + ']'
+
+
+def vector_literal(embedding):
+    """Format an embedding as a pgvector text literal"""
+    return _VECTOR_FORMAT % tuple(np.asarray(embedding, dtype=np.float16).tolist())
+
+# Accumulated embeddings are streamed with COPY once there are at least this many
+EMBEDDING_COPY_THRESHOLD = 1000
+
+# HNSW candidate list size for similarity searches (pgvector's default is 40).
+# The article_source filter is applied after the index scan, so a larger list
+# keeps filtered searches from returning fewer than the requested rows
+SIMILARITY_EF_SEARCH = 200
+
+# Async embedding requests in flight, and retries of rate limited, failed or timed out requests
+EMBEDDING_CONCURRENCY = 8
+EMBEDDING_MAX_RETRIES = 5
 
 class VectorEmbedding:
     def __init__(self, db_connector=None):
@@ -32,23 +66,69 @@ class VectorEmbedding:
             )
             self.db.connect()
         
-        # Create embeddings table if it doesn't exist
-        self.create_embeddings_table()
+        # One keep-alive HTTP/2 client shared by every embeddings request
+        self.http_client = httpx.Client(
+            http2=True,
+            timeout=600.0,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16)
+        )
+        self.client = OpenAI(api_key=OPENAI_API_KEY, http_client=self.http_client)
+        
+        # The vector type must exist before the table and the adapter can use it
+        self.add_vector_extension()
+        self.register_vector_type()
+        
+        # Create embeddings table if it doesn't exist; False if it has the wrong vector type
+        self.table_ready = self.create_embeddings_table()
+        self._iterative_scan = None
+
+    def register_vector_type(self):
+        """Let psycopg2 send numpy arrays as vectors and read vectors back as numpy arrays"""
+        try:
+            register_vector(self.db.conn)
+            return True
+        except Exception as e:
+            print(f"Error registering pgvector type: {str(e)}")
+            self.db.conn.rollback()
+            return False
 
     def create_embeddings_table(self):
-        """Create table for storing embeddings if it doesn't exist"""
+        """Create table for storing embeddings if it doesn't exist
+        
+        Returns False without touching the table if it still holds embeddings
+        of another type (e.g. the earlier vector(1536) ada-002 embeddings),
+        since those cannot be compared with the current model's.
+        """
         try:
-            create_table_query = """
+            create_table_query = sql.SQL("""
             CREATE TABLE IF NOT EXISTS article_embeddings (
                 id SERIAL PRIMARY KEY,
                 article_id INTEGER NOT NULL,
                 article_source TEXT NOT NULL,
-                embedding VECTOR(1536),
+                embedding HALFVEC({}),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 UNIQUE(article_id, article_source)
             );
-            """
+            """).format(sql.Literal(EMBEDDING_DIMENSION))
             self.db.cursor.execute(create_table_query)
+            
+            self.db.cursor.execute("""
+            SELECT format_type(atttypid, atttypmod)
+            FROM pg_attribute
+            WHERE attrelid = 'article_embeddings'::regclass AND attname = 'embedding'
+            """)
+            column_type = self.db.cursor.fetchone()[0]
+            if column_type != f"halfvec({EMBEDDING_DIMENSION})":
+                print(f"article_embeddings.embedding is {column_type}, expected halfvec({EMBEDDING_DIMENSION}). "
+                      f"Drop the table to rebuild it with {EMBEDDING_MODEL} embeddings.")
+                self.db.conn.rollback()
+                return False
+            
+            # Approximate nearest-neighbour index for cosine distance searches
+            self.db.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS article_emb_hnsw
+            ON article_embeddings USING hnsw (embedding halfvec_cosine_ops);
+            """)
             self.db.conn.commit()
             print("Article embeddings table created or already exists")
             return True
@@ -72,27 +152,31 @@ class VectorEmbedding:
             self.db.conn.rollback()
             return False
 
-    def get_articles(self, source='multifamilydive', limit=100, offset=0):
-        """Retrieve articles from specified source
+    def get_articles(self, source='multifamilydive', limit=100, last_id=0):
+        """Retrieve articles from specified source that have no embedding yet
         
         Args:
             source: Source table name (multifamilydive_articles, credaily_articles, multihousing_articles)
             limit: Maximum number of articles to retrieve
-            offset: Number of articles to skip
+            last_id: Only articles with an id greater than this are returned
             
         Returns:
             List of dictionaries containing article data
         """
         table_name = f"{source}_articles"
         try:
+            # Anti-join so articles that already have an embedding are skipped
             query = sql.SQL("""
-            SELECT id, title, summary, content
-            FROM {}
-            ORDER BY id
-            LIMIT %s OFFSET %s
+            SELECT a.id, a.title, a.summary, a.content
+            FROM {} a
+            LEFT JOIN article_embeddings e
+              ON e.article_id = a.id AND e.article_source = %s
+            WHERE e.id IS NULL AND a.id > %s
+            ORDER BY a.id
+            LIMIT %s
             """).format(sql.Identifier(table_name))
             
-            self.db.cursor.execute(query, (limit, offset))
+            self.db.cursor.execute(query, (source, last_id, limit))
             results = self.db.cursor.fetchall()
             
             articles = []
@@ -111,6 +195,62 @@ class VectorEmbedding:
             print(f"Error retrieving articles from {table_name}: {str(e)}")
             return []
 
+    def iter_articles(self, source='multifamilydive', total_limit=None, batch_size=100):
+        """Stream articles without an embedding yet, batch_size rows per query
+        
+        Pages are keyed on the last id seen (id > last_id), so embeddings saved
+        between pages, or a failed save rolled back, never make rows be skipped
+        or stop the stream. Title, summary and content are joined into the
+        embedding text by the database and cut to EMBEDDING_TEXT_MAX_CHARS
+        there, so long articles are never sent in full.
+        
+        Args:
+            source: Source table name (multifamilydive, credaily, multihousing)
+            total_limit: Maximum number of articles to yield (None for all)
+            batch_size: Number of rows fetched from the server per query
+            
+        Yields:
+            Dictionaries with the article's id, text and source
+        """
+        table_name = f"{source}_articles"
+        # Anti-join so articles that already have an embedding are skipped
+        query = sql.SQL("""
+        SELECT a.id,
+               LEFT(COALESCE(a.title, '') || ' ' || COALESCE(a.summary, '') || ' ' || COALESCE(a.content, ''),
+                    %s) AS text
+        FROM {} a
+        LEFT JOIN article_embeddings e
+          ON e.article_id = a.id AND e.article_source = %s
+        WHERE e.id IS NULL AND a.id > %s
+        ORDER BY a.id
+        LIMIT %s
+        """).format(sql.Identifier(table_name))
+        
+        last_id = 0
+        remaining = total_limit
+        while remaining is None or remaining > 0:
+            page_size = batch_size if remaining is None else min(batch_size, remaining)
+            try:
+                self.db.cursor.execute(query, (EMBEDDING_TEXT_MAX_CHARS, source, last_id, page_size))
+                rows = self.db.cursor.fetchall()
+            except Exception as e:
+                print(f"Error streaming articles from {table_name}: {str(e)}")
+                self.db.conn.rollback()
+                return
+            
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+            
+            for row in rows:
+                yield {
+                    'id': row[0],
+                    'text': row[1],
+                    'source': source
+                }
+
     def create_embedding(self, text):
         """Create embedding for the given text using OpenAI's API
         
@@ -118,109 +258,341 @@ class VectorEmbedding:
             text: Text to create embedding for
             
         Returns:
-            Numpy array containing embedding
+            List of floats containing embedding
+        """
+        embeddings = self.create_embeddings([text])
+        return embeddings[0] if embeddings else None
+
+    def create_embeddings(self, texts):
+        """Create embeddings for several texts with as few OpenAI API requests as possible
+        
+        Each text is cut to the model's token limit, and the texts are split
+        into several requests when together they exceed the per-request cap.
+        
+        Args:
+            texts: List of texts to create embeddings for
+            
+        Returns:
+            List of embeddings (lists of floats) in the same order as texts,
+            or None if a request failed
         """
         try:
-            # Truncate text if too long (OpenAI has token limits)
-            max_tokens = 8000
-            if len(text) > max_tokens * 4:  # Rough estimate: 4 chars per token
-                text = text[:max_tokens * 4]
+            embeddings = []
+            for inputs in batch_by_tokens(texts):
+                response = self.client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=inputs,
+                    dimensions=EMBEDDING_DIMENSION
+                )
+                # Results carry the index of their input; put them back in input order
+                embeddings.extend(d.embedding for d in sorted(response.data, key=lambda d: d.index))
+            return embeddings
+        except Exception as e:
+            print(f"Error creating embeddings: {str(e)}")
+            return None
+
+    async def create_embeddings_async(self, client, semaphore, texts):
+        """Create embeddings for several texts without blocking the event loop
+        
+        The client retries rate limited (429), server error, connection error
+        and timed out requests with exponential backoff, honouring Retry-After.
+        
+        Args:
+            client: AsyncOpenAI client used for the request
+            semaphore: asyncio.Semaphore bounding the requests in flight
+            texts: List of texts to create embeddings for
             
-            response = openai.Embedding.create(
-                model="text-embedding-ada-002",
-                input=text
-            )
+        Returns:
+            List of embeddings in the same order as texts, or None if the request failed
+        """
+        try:
+            # Cut texts to the token limits (see create_embeddings); tokenizing is
+            # CPU work, so it runs in a thread instead of on the event loop
+            requests = await asyncio.to_thread(batch_by_tokens, texts)
             
-            # Extract the embedding from the response
-            embedding = response['data'][0]['embedding']
-            return embedding
+            embeddings = []
+            for inputs in requests:
+                async with semaphore:
+                    response = await client.embeddings.create(
+                        model=EMBEDDING_MODEL,
+                        input=inputs,
+                        dimensions=EMBEDDING_DIMENSION
+                    )
+                # Results carry the index of their input; put them back in input order
+                embeddings.extend(d.embedding for d in sorted(response.data, key=lambda d: d.index))
+            return embeddings
         except Exception as e:
-            print(f"Error creating embedding: {str(e)}")
+            print(f"Error creating embeddings: {str(e)}")
             return None
 
+    def _prepare_embedding_insert(self):
+        """PREPARE the single-row embedding upsert on the connector's session"""
+        self.db.prepare_statement('ins_emb', sql.SQL("""
+        INSERT INTO article_embeddings 
+        (article_id, article_source, embedding)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (article_id, article_source) DO UPDATE 
+        SET embedding = EXCLUDED.embedding,
+            created_at = CURRENT_TIMESTAMP
+        """))
+
     def save_embedding(self, article_id, article_source, embedding):
         """Save embedding to database
         
         Args:
             article_id: ID of the article
             article_source: Source of the article (multifamilydive, credaily, multihousing)
-            embedding: Numpy array containing embedding
+            embedding: List of floats or numpy array containing embedding
             
         Returns:
             Boolean indicating success
         """
+        return self.save_embeddings_prepared([(article_id, article_source, embedding)]) == 1
+
+    def save_embeddings_prepared(self, rows):
+        """Save embeddings one row at a time with a prepared upsert, in one transaction
+        
+        Args:
+            rows: List of (article_id, article_source, embedding) tuples
+            
+        Returns:
+            Number of embeddings saved (all or none)
+        """
         try:
-            # Convert embedding to string format for Postgres
-            embedding_str = f"[{','.join(str(x) for x in embedding)}]"
+            self._prepare_embedding_insert()
+            for article_id, article_source, embedding in rows:
+                self.db.cursor.execute("EXECUTE ins_emb (%s, %s, %s)", (
+                    article_id,
+                    article_source,
+                    np.asarray(embedding, dtype=np.float16)
+                ))
+            self.db.conn.commit()
+            return len(rows)
+        except Exception as e:
+            print(f"Error saving embedding: {str(e)}")
+            self.db.conn.rollback()
+            return 0
+
+    def save_embeddings_bulk(self, rows):
+        """Save many embeddings to database in one statement and one commit
+        
+        Args:
+            rows: List of (article_id, article_source, embedding) tuples
+            
+        Returns:
+            Number of embeddings saved
+        """
+        if not rows:
+            return 0
+        try:
+            # float16 arrays go through the pgvector adapter, no manual string building
+            values = [
+                (article_id, article_source, np.asarray(embedding, dtype=np.float16))
+                for article_id, article_source, embedding in rows
+            ]
             
             insert_query = """
             INSERT INTO article_embeddings 
             (article_id, article_source, embedding)
-            VALUES (%s, %s, %s)
+            VALUES %s
             ON CONFLICT (article_id, article_source) DO UPDATE 
             SET embedding = EXCLUDED.embedding,
                 created_at = CURRENT_TIMESTAMP
             """
             
-            self.db.cursor.execute(insert_query, (
-                article_id,
-                article_source,
-                embedding_str
-            ))
+            execute_values(self.db.cursor, insert_query, values, template="(%s, %s, %s::halfvec)", page_size=500)
             self.db.conn.commit()
-            return True
+            return len(values)
         except Exception as e:
-            print(f"Error saving embedding: {str(e)}")
+            print(f"Error saving embeddings: {str(e)}")
             self.db.conn.rollback()
-            return False
+            return 0
 
-    def process_articles(self, source='multifamilydive', limit=100, batch_size=10):
+    def bulk_copy_embeddings(self, rows):
+        """Save many embeddings through a COPY-loaded staging table
+        
+        Faster than save_embeddings_bulk for large backfills because rows are
+        streamed with COPY instead of being parsed as one big INSERT.
+        
+        Args:
+            rows: List of (article_id, article_source, embedding) tuples
+            
+        Returns:
+            Number of embeddings saved
+        """
+        if not rows:
+            return 0
+        # ON CONFLICT cannot touch the same row twice in one statement
+        unique_rows = list({(row[0], row[1]): row for row in rows}.values())
+        
+        buf = io.StringIO()
+        for article_id, article_source, embedding in unique_rows:
+            buf.write(f"{article_id}\t{article_source}\t{vector_literal(embedding)}\n")
+        buf.seek(0)
+        
+        try:
+            self.db.cursor.execute(sql.SQL("""
+            CREATE TEMP TABLE stage_emb (
+                article_id INTEGER,
+                article_source TEXT,
+                embedding HALFVEC({})
+            ) ON COMMIT DROP
+            """).format(sql.Literal(EMBEDDING_DIMENSION)))
+            self.db.cursor.copy_expert("COPY stage_emb FROM STDIN WITH (FORMAT text)", buf)
+            self.db.cursor.execute("""
+            INSERT INTO article_embeddings 
+            (article_id, article_source, embedding)
+            SELECT article_id, article_source, embedding FROM stage_emb
+            ON CONFLICT (article_id, article_source) DO UPDATE 
+            SET embedding = EXCLUDED.embedding,
+                created_at = CURRENT_TIMESTAMP
+            """)
+            self.db.conn.commit()
+            return len(rows)
+        except Exception as e:
+            print(f"Error bulk copying embeddings: {str(e)}")
+            self.db.conn.rollback()
+            return 0
+
+    def _save_embedding_rows(self, rows, source):
+        """Save accumulated embedding rows, using COPY for large sets"""
+        if len(rows) >= EMBEDDING_COPY_THRESHOLD:
+            saved_count = self.bulk_copy_embeddings(rows)
+        else:
+            saved_count = self.save_embeddings_bulk(rows)
+        if saved_count:
+            print(f"Processed {saved_count} articles from {source}")
+        else:
+            print(f"Failed to save embeddings for {len(rows)} articles from {source}")
+        return saved_count
+
+    def process_articles(self, source='multifamilydive', limit=100, batch_size=100):
         """Process articles from specified source, create embeddings and save them
         
+        Embeddings are accumulated across batches and written once
+        EMBEDDING_COPY_THRESHOLD of them are pending, plus once at the end.
+        
         Args:
             source: Source table name (multifamilydive, credaily, multihousing)
-            limit: Maximum number of articles to process
-            batch_size: Number of articles to process in one batch
+            limit: Maximum number of articles to read from the source table
+            batch_size: Number of articles to process in one batch (and one embeddings request)
             
         Returns:
             Number of successfully processed articles
         """
-        offset = 0
+        if not self.table_ready:
+            print("article_embeddings is not ready; not creating any embeddings")
+            return 0
+        
         processed_count = 0
+        pending_rows = []
+        articles_stream = self.iter_articles(source, limit, batch_size)
         
-        while processed_count < limit:
+        while True:
             # Get batch of articles
-            batch_limit = min(batch_size, limit - processed_count)
-            articles = self.get_articles(source, batch_limit, offset)
+            articles = list(islice(articles_stream, batch_size))
             
             if not articles:
                 break
                 
-            for article in articles:
-                # Combine title, summary, and content for embedding
-                text = f"{article['title']} {article['summary']} {article['content']}"
+            texts = [article['text'] for article in articles]
+            
+            # Create embeddings for the whole batch in one request
+            embeddings = self.create_embeddings(texts)
+            
+            if embeddings:
+                pending_rows.extend(
+                    (article['id'], article['source'], embedding) for article, embedding in zip(articles, embeddings)
+                )
+                if len(pending_rows) >= EMBEDDING_COPY_THRESHOLD:
+                    processed_count += self._save_embedding_rows(pending_rows, source)
+                    pending_rows = []
+            else:
+                print(f"Failed to create embeddings for {len(articles)} articles from {source}")
+        
+        if pending_rows:
+            processed_count += self._save_embedding_rows(pending_rows, source)
+                
+        print(f"Successfully processed {processed_count} articles from {source}")
+        return processed_count
+
+    async def process_articles_async(self, source='multifamilydive', limit=100, batch_size=100,
+                                     concurrency=EMBEDDING_CONCURRENCY):
+        """Like process_articles, but with several embedding requests in flight
+        
+        Args:
+            source: Source table name (multifamilydive, credaily, multihousing)
+            limit: Maximum number of articles to read from the source table
+            batch_size: Number of articles per embeddings request
+            concurrency: Maximum number of embedding requests in flight
+            
+        Returns:
+            Number of successfully processed articles
+        """
+        if not self.table_ready:
+            print("article_embeddings is not ready; not creating any embeddings")
+            return 0
+        
+        processed_count = 0
+        pending_rows = []
+        articles_stream = self.iter_articles(source, limit, batch_size)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        # One HTTP/2 client shared by every request of the run
+        async with httpx.AsyncClient(
+            http2=True,
+            timeout=600.0,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        ) as http_client:
+            client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client,
+                                 max_retries=EMBEDDING_MAX_RETRIES)
+            while True:
+                # Read enough batches to keep every request slot busy
+                batches = []
+                for _ in range(concurrency):
+                    articles = list(islice(articles_stream, batch_size))
+                    if not articles:
+                        break
+                    batches.append(articles)
+                
+                if not batches:
+                    break
                 
-                # Create embedding
-                embedding = self.create_embedding(text)
+                results = await asyncio.gather(*(
+                    self.create_embeddings_async(
+                        client, semaphore,
+                        [article['text'] for article in articles]
+                    )
+                    for articles in batches
+                ))
                 
-                if embedding:
-                    # Save embedding
-                    if self.save_embedding(article['id'], article['source'], embedding):
-                        processed_count += 1
-                        print(f"Processed article {article['id']} from {article['source']}")
+                for articles, embeddings in zip(batches, results):
+                    if embeddings:
+                        pending_rows.extend(
+                            (article['id'], article['source'], embedding) for article, embedding in zip(articles, embeddings)
+                        )
                     else:
-                        print(f"Failed to save embedding for article {article['id']} from {article['source']}")
-                else:
-                    print(f"Failed to create embedding for article {article['id']} from {article['source']}")
-            
-            offset += len(articles)
-            
-            if len(articles) < batch_limit:
-                break
+                        print(f"Failed to create embeddings for {len(articles)} articles from {source}")
                 
+                if len(pending_rows) >= EMBEDDING_COPY_THRESHOLD:
+                    processed_count += self._save_embedding_rows(pending_rows, source)
+                    pending_rows = []
+        
+        if pending_rows:
+            processed_count += self._save_embedding_rows(pending_rows, source)
+        
         print(f"Successfully processed {processed_count} articles from {source}")
         return processed_count
 
+    def _supports_iterative_scan(self):
+        """Whether the installed pgvector (0.8.0+) can extend an HNSW scan until enough rows pass the filters"""
+        if self._iterative_scan is None:
+            self.db.cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            row = self.db.cursor.fetchone()
+            version = tuple(int(part) for part in row[0].split('.')[:2]) if row else (0, 0)
+            self._iterative_scan = version >= (0, 8)
+        return self._iterative_scan
+
     def find_similar_articles(self, query_text, source='multifamilydive', limit=5):
         """Find articles similar to the query text
         
@@ -239,23 +611,32 @@ class VectorEmbedding:
             if not query_embedding:
                 return []
                 
-            # Convert embedding to string format for Postgres
-            query_embedding_str = f"[{','.join(str(x) for x in query_embedding)}]"
-            
+            query_vector = np.asarray(query_embedding, dtype=np.float16)
             table_name = f"{source}_articles"
             
-            # Query for similar articles
-            query = f"""
+            # Query for similar articles; ordering by the raw distance lets the
+            # HNSW index answer the query instead of a sequential scan
+            query = sql.SQL("""
             SELECT a.id, a.title, a.summary, a.content,
-                   1 - (e.embedding <=> '{query_embedding_str}'::vector) AS similarity
-            FROM {table_name} a
+                   1 - (e.embedding <=> %s) AS similarity
+            FROM {} a
             JOIN article_embeddings e ON a.id = e.article_id AND e.article_source = %s
-            ORDER BY similarity DESC
+            ORDER BY e.embedding <=> %s
             LIMIT %s
-            """
+            """).format(sql.Identifier(table_name))
             
-            self.db.cursor.execute(query, (source, limit))
+            # The source filter runs after the index scan; widen the scan for this
+            # transaction so other sources' neighbours don't crowd out the results
+            # (ef_search accepts at most 1000)
+            ef_search = min(max(SIMILARITY_EF_SEARCH, limit), 1000)
+            self.db.cursor.execute("SET LOCAL hnsw.ef_search = %s", (ef_search,))
+            if self._supports_iterative_scan():
+                self.db.cursor.execute("SET LOCAL hnsw.iterative_scan = strict_order")
+            
+            self.db.cursor.execute(query, (query_vector, source, query_vector, limit))
             results = self.db.cursor.fetchall()
+            # End the transaction so the SET LOCAL settings are reset
+            self.db.conn.commit()
             
             similar_articles = []
             for row in results:
@@ -271,11 +652,13 @@ class VectorEmbedding:
             return similar_articles
         except Exception as e:
             print(f"Error finding similar articles: {str(e)}")
+            self.db.conn.rollback()
             return []
 
     def close(self):
-        """Close database connection"""
+        """Close database connection and the OpenAI HTTP client"""
         self.db.disconnect()
+        self.http_client.close()
 
 
 def main():
@@ -287,21 +670,35 @@ def main():
     parser.add_argument("--source", choices=["multifamilydive", "credaily", "multihousing"], 
                         default="multifamilydive", help="Source of articles")
     parser.add_argument("--limit", type=int, default=100, help="Maximum number of articles to process")
-    parser.add_argument("--batch-size", type=int, default=10, help="Number of articles per batch")
+    parser.add_argument("--batch-size", type=int, default=100, help="Number of articles per batch")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="Number of embedding requests in flight (0 processes batches one at a time)")
     args = parser.parse_args()
     
     # Create vector embedding processor
     vector_processor = VectorEmbedding()
+    if not vector_processor.table_ready:
+        # Embeddings created now could not be saved, so don't pay for them
+        print("Error: article_embeddings table is not usable, no embeddings created")
+        vector_processor.close()
+        close_all_pools()
+        return
     
     try:
         # Ensure pgvector extension is installed
         vector_processor.add_vector_extension()
         
         # Process articles
-        vector_processor.process_articles(args.source, args.limit, args.batch_size)
+        if args.concurrency > 0:
+            asyncio.run(vector_processor.process_articles_async(
+                args.source, args.limit, args.batch_size, args.concurrency
+            ))
+        else:
+            vector_processor.process_articles(args.source, args.limit, args.batch_size)
     finally:
         # Close database connection
         vector_processor.close()
+        close_all_pools()
 
 
 if __name__ == "__main__":